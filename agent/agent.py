@@ -2,6 +2,7 @@
 Main Finance Agent Class with LangGraph workflow
 """
 
+import uuid
 from typing import Dict, Any, AsyncGenerator
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
@@ -10,49 +11,75 @@ from agent.agent_state import AgentState, create_initial_state
 from agent.nodes.planner import plan_tasks
 from agent.nodes.tool_caller import create_tool_caller
 from agent.nodes.validator import create_validator
-from agent.nodes.error_handler import handle_errors
+from agent.nodes.error_handler import create_error_handler
 from agent.nodes.synthesizer import synthesize_answer
 from agent.routing import route_next_action
 
 
+# Process-wide checkpointer shared by every compiled graph; runs are isolated by thread_id.
+# Its default serializer msgpack-encodes state (pydantic models as ext types), not pickle,
+# and each put only writes the channels whose versions changed in that step
+_checkpointer = MemorySaver()
+
+
 class FinanceAgent:
     """Main agent class that wraps LangGraph execution"""
 
-    def __init__(self, mcp_server_url: str = "http://localhost:8000/sse"):
+    def __init__(self, mcp_server_url: str = "http://localhost:8000/sse", mcp_manager: MCPToolManager = None):
         self.mcp_server_url = mcp_server_url
-        self.mcp_manager = None
+        # A connected manager passed in is shared with the caller and not closed here
+        self.mcp_manager = mcp_manager
+        self.owns_mcp_manager = mcp_manager is None
         self.graph = None
         self.tools = None
 
     async def initialize(self):
         """Initialize MCP connection and build graph"""
-        # Connect to MCP
-        self.mcp_manager = MCPToolManager(self.mcp_server_url)
-        await self.mcp_manager.connect()
+        # Connect to MCP unless an already-connected manager was supplied
+        if self.mcp_manager is None:
+            self.mcp_manager = MCPToolManager(self.mcp_server_url)
+            await self.mcp_manager.connect()
 
         # Get available tools
         self.tools = await self.mcp_manager.get_langchain_tools()
 
-        # Build LangGraph
-        self.graph = self._build_graph()
+        # Build LangGraph (reused across agents sharing an MCP manager)
+        self.graph = self._graph_for(self.mcp_manager)
 
         return self
 
-    def _build_graph(self) -> StateGraph:
-        """Constructs the LangGraph workflow"""
+    @staticmethod
+    def _graph_for(mcp_manager: MCPToolManager) -> StateGraph:
+        """
+        Compiled workflow for an MCP manager, built on first use
+        Kept on the manager itself so it is freed with the manager instead of pinned by a cache;
+        the nodes look tools up through the manager at run time, so the tool set needs no key
+        """
+        graph = getattr(mcp_manager, "_agent_graph", None)
+        if graph is None:
+            graph = FinanceAgent._build_graph(mcp_manager)
+            mcp_manager._agent_graph = graph
+        return graph
+
+    @staticmethod
+    def _build_graph(mcp_manager: MCPToolManager) -> StateGraph:
+        """
+        Constructs and compiles the LangGraph workflow
+        """
 
         # Create graph
         workflow = StateGraph(AgentState)
 
         # Create node functions with MCP manager in closure
-        execute_tools_node = create_tool_caller(self.mcp_manager)
-        validate_results_node = create_validator(self.mcp_manager)
+        execute_tools_node = create_tool_caller(mcp_manager)
+        validate_results_node = create_validator(mcp_manager)
+        handle_errors_node = create_error_handler(mcp_manager)
 
         # Add nodes
         workflow.add_node("planner", plan_tasks)
         workflow.add_node("tool_caller", execute_tools_node)
         workflow.add_node("validator", validate_results_node)
-        workflow.add_node("error_handler", handle_errors)
+        workflow.add_node("error_handler", handle_errors_node)
         workflow.add_node("synthesizer", synthesize_answer)
 
         # Set entry point
@@ -98,6 +125,7 @@ class FinanceAgent:
             {
                 "planner": "planner",  # Replan
                 "tool_caller": "tool_caller",  # Retry
+                "validator": "validator",  # Inline retry completed the plan
                 "synthesizer": "synthesizer"  # Give up
             }
         )
@@ -105,10 +133,8 @@ class FinanceAgent:
         # Synthesizer always goes to END
         workflow.add_edge("synthesizer", END)
 
-        # Compile with checkpointing
-        memory = MemorySaver()
-
-        return workflow.compile(checkpointer=memory)
+        # Compile with the shared checkpointer
+        return workflow.compile(checkpointer=_checkpointer)
 
     async def run(self, query: str, config: dict = None) -> AsyncGenerator[Dict[str, Any], None]:
         """
@@ -131,17 +157,24 @@ class FinanceAgent:
             max_retries=3
         )
 
-        # Use default config if none provided
-        if config is None:
-            config = {"configurable": {"thread_id": "default"}}
-
-        # Stream execution
-        async for event in self.graph.astream(initial_state, config=config):
-            # Each event is a dict with node name as key and updated state as value
-            # Example: {"planner": {...updated_state...}}
-            yield event
+        # Without a caller-supplied thread, run on a fresh one so state from earlier
+        # runs in the shared checkpointer never leaks in; it is dropped afterwards
+        owns_thread = config is None
+        if owns_thread:
+            config = {"configurable": {"thread_id": f"run-{uuid.uuid4().hex}"}}
+
+        try:
+            # Stream execution
+            async for event in self.graph.astream(initial_state, config=config):
+                # Each event is a dict with node name as key and updated state as value
+                # Example: {"planner": {...updated_state...}}
+                yield event
+        finally:
+            delete_thread = getattr(_checkpointer, "delete_thread", None)
+            if owns_thread and delete_thread:
+                delete_thread(config["configurable"]["thread_id"])
 
     async def close(self):
         """Close the MCP connection"""
-        if self.mcp_manager:
+        if self.mcp_manager and self.owns_mcp_manager:
             await self.mcp_manager.close()
@@ -5,17 +5,20 @@ Defines all state structures and supporting Pydantic models
 
 from typing import TypedDict, Annotated, Sequence, List, Dict, Any, Optional
 from langchain_core.messages import BaseMessage
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 import operator
 from datetime import datetime
 
 
 class SubTask(BaseModel):
-    """Represents a decomposed subtask"""
+    """Represents a decomposed subtask (mutable: status/result are updated in place)"""
+    model_config = ConfigDict(extra='forbid')
+
     id: str
     description: str
     status: str  # 'pending', 'in_progress', 'completed', 'failed'
-    assigned_tools: List[str] = []
+    assigned_tools: List[str] = Field(default_factory=list)
+    dependencies: List[str] = Field(default_factory=list)  # ids of subtasks that must complete first
     result: Optional[str] = None
     error: Optional[str] = None
     retry_count: int = 0
@@ -23,6 +26,8 @@ class SubTask(BaseModel):
 
 class ToolExecution(BaseModel):
     """Tracks a single tool execution"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     tool_name: str
     arguments: Dict[str, Any]
     result: Optional[str] = None
@@ -33,18 +38,43 @@ class ToolExecution(BaseModel):
 
 class ReasoningStep(BaseModel):
     """Captures agent reasoning for UI display"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     step_type: str  # 'planning', 'tool_call', 'validation', 'error', 'summary'
     content: str
     timestamp: str
-    metadata: Dict[str, Any] = {}
+    metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
 class ValidationResult(BaseModel):
     """Result of cross-validation"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     is_valid: bool
     confidence: float
-    issues: List[str] = []
-    cross_check_results: Dict[str, Any] = {}
+    issues: List[str] = Field(default_factory=list)
+    cross_check_results: Dict[str, Any] = Field(default_factory=dict)
+
+
+# Cap on accumulated log-style state lists for long-running agents
+MAX_ACCUMULATED_ITEMS = 256
+
+
+def append_bounded(existing: list, new: list) -> list:
+    """
+    Reducer that appends updates in place instead of copying via operator.add
+    Keeps only the newest MAX_ACCUMULATED_ITEMS entries
+    """
+    existing.extend(new)
+    if len(existing) > MAX_ACCUMULATED_ITEMS:
+        del existing[:len(existing) - MAX_ACCUMULATED_ITEMS]
+    return existing
+
+
+def merge_dict(existing: dict, new: dict) -> dict:
+    """Reducer that merges a node's delta into the existing dict in place"""
+    existing.update(new)
+    return existing
 
 
 class AgentState(TypedDict):
@@ -58,14 +88,15 @@ class AgentState(TypedDict):
 
     # Task decomposition
     subtasks: List[SubTask]
+    subtasks_by_id: Dict[str, SubTask]
     completed_subtasks: List[str]
 
     # Tool execution tracking
-    tool_executions: Annotated[List[ToolExecution], operator.add]
+    tool_executions: Annotated[List[ToolExecution], append_bounded]
     available_tools: List[str]
 
     # Reasoning and transparency
-    reasoning_steps: Annotated[List[ReasoningStep], operator.add]
+    reasoning_steps: Annotated[List[ReasoningStep], append_bounded]
 
     # Iteration control
     iteration_count: int
@@ -76,12 +107,13 @@ class AgentState(TypedDict):
     needs_validation: bool
 
     # Error handling
-    errors: Annotated[List[Dict[str, Any]], operator.add]
+    errors: Annotated[List[Dict[str, Any]], append_bounded]
     retry_count: int
     max_retries: int
 
     # Results aggregation
-    intermediate_results: Dict[str, Any]
+    intermediate_results: Annotated[Dict[str, Any], merge_dict]
+    speculative_tool_call: Optional[Dict[str, Any]]  # tool selection issued alongside the planner
     final_answer: Optional[str]
 
     # Control flags
@@ -95,9 +127,12 @@ def get_timestamp() -> str:
     return datetime.now().isoformat()
 
 
+# Helpers below use model_construct: all inputs are built internally by the
+# agent nodes, so per-field validation on every state update is skipped
+
 def create_reasoning_step(step_type: str, content: str, metadata: Dict[str, Any] = None) -> ReasoningStep:
     """Helper to create a reasoning step"""
-    return ReasoningStep(
+    return ReasoningStep.model_construct(
         step_type=step_type,
         content=content,
         timestamp=get_timestamp(),
@@ -113,7 +148,7 @@ def create_tool_execution(
     subtask_id: Optional[str] = None
 ) -> ToolExecution:
     """Helper to create a tool execution record"""
-    return ToolExecution(
+    return ToolExecution.model_construct(
         tool_name=tool_name,
         arguments=arguments,
         result=result,
@@ -123,13 +158,34 @@ def create_tool_execution(
     )
 
 
-def create_subtask(task_id: str, description: str, assigned_tools: List[str]) -> SubTask:
+def create_subtask(
+    task_id: str,
+    description: str,
+    assigned_tools: List[str],
+    dependencies: Optional[List[str]] = None
+) -> SubTask:
     """Helper to create a subtask"""
-    return SubTask(
+    return SubTask.model_construct(
         id=task_id,
         description=description,
         status="pending",
-        assigned_tools=assigned_tools
+        assigned_tools=list(assigned_tools),
+        dependencies=list(dependencies or [])
+    )
+
+
+def create_validation_result(
+    is_valid: bool,
+    confidence: float,
+    issues: List[str] = None,
+    cross_check_results: Dict[str, Any] = None
+) -> ValidationResult:
+    """Helper to create a validation result"""
+    return ValidationResult.model_construct(
+        is_valid=is_valid,
+        confidence=confidence,
+        issues=issues or [],
+        cross_check_results=cross_check_results or {}
     )
 
 
@@ -140,6 +196,7 @@ def create_initial_state(query: str, available_tools: List[str], max_iterations:
         "original_query": query,
         "current_task": None,
         "subtasks": [],
+        "subtasks_by_id": {},
         "completed_subtasks": [],
         "tool_executions": [],
         "available_tools": available_tools,
@@ -152,6 +209,7 @@ def create_initial_state(query: str, available_tools: List[str], max_iterations:
         "retry_count": 0,
         "max_retries": max_retries,
         "intermediate_results": {},
+        "speculative_tool_call": None,
         "final_answer": None,
         "should_continue": True,
         "needs_replanning": False,
@@ -5,13 +5,13 @@ LangGraph node functions for agentic workflow
 from agent.nodes.planner import plan_tasks
 from agent.nodes.tool_caller import create_tool_caller
 from agent.nodes.validator import create_validator
-from agent.nodes.error_handler import handle_errors
+from agent.nodes.error_handler import create_error_handler
 from agent.nodes.synthesizer import synthesize_answer
 
 __all__ = [
     "plan_tasks",
     "create_tool_caller",
     "create_validator",
-    "handle_errors",
+    "create_error_handler",
     "synthesize_answer",
 ]
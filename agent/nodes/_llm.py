@@ -0,0 +1,29 @@
+"""
+Shared LLM instances and helpers for agent nodes
+"""
+
+from functools import lru_cache
+from langchain_anthropic import ChatAnthropic
+
+
+MODEL_NAME = "claude-sonnet-4-5"
+
+
+@lru_cache(maxsize=None)
+def get_llm(temperature: float = 0) -> ChatAnthropic:
+    """
+    Get the process-wide ChatAnthropic client for a temperature
+    Created lazily so API keys loaded via dotenv after import are picked up
+    """
+    return ChatAnthropic(model=MODEL_NAME, temperature=temperature)
+
+
+def chunk_text(content) -> str:
+    """Extract text from a streamed message chunk (plain string or content blocks)"""
+    if isinstance(content, str):
+        return content
+
+    return "".join(
+        item.get('text', '') for item in content
+        if isinstance(item, dict)
+    )
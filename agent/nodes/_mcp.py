@@ -0,0 +1,20 @@
+"""
+Shared MCP call adapter for agent nodes
+"""
+
+import asyncio
+import inspect
+
+
+def make_call_tool(mcp_manager):
+    """
+    Get an awaitable call_tool(tool_name, tool_args) for an MCP manager
+    Sync MCP clients run in a worker thread so they don't block the event loop
+    """
+    if inspect.iscoroutinefunction(mcp_manager.call_tool):
+        return mcp_manager.call_tool
+
+    def call_tool(tool_name: str, tool_args: dict):
+        return asyncio.to_thread(mcp_manager.call_tool, tool_name, tool_args)
+
+    return call_tool
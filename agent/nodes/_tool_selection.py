@@ -0,0 +1,64 @@
+"""
+Tool selection prompt and response parsing shared by the planner and tool caller
+"""
+
+import re
+import orjson
+from functools import lru_cache
+
+
+# Static tool-selection instructions appended to the per-subtask header
+_TOOL_SELECTION_PROMPT_SUFFIX = """Based on this subtask, determine which tool to call and with what arguments.
+
+Available tools and their EXACT parameters (use these exact names):
+- get_hpl_formula(hierarchy: str) - hierarchy must be "FHC" or "PRA"
+- update_hpl_formula(hierarchy: str, new_formula: str) - IMPORTANT: parameter is "new_formula" not "formula". The formula MUST include the full equation with "Hypothetical P&L = " on the left side.
+- get_all_hierarchies() - no parameters
+- get_all_accounts() - no parameters
+- get_account_pnl(account_number: str) - provide account number like "ACCT-001"
+- calculate_hypothetical_pnl(account_number: str, hierarchy: str) - provide account number and hierarchy (FHC or PRA)
+
+CRITICAL:
+1. Use the EXACT parameter names shown above. For update_hpl_formula, the parameter is "new_formula" NOT "formula".
+2. When updating formulas, PRESERVE the complete equation including "Hypothetical P&L = " before the calculation. DO NOT extract only the right-hand side.
+
+Respond ONLY with a valid JSON object in this exact format:
+{
+  "tool": "tool_name",
+  "arguments": {"arg_name": "arg_value"}
+}
+
+Examples:
+- For "Get all hierarchies": {"tool": "get_all_hierarchies", "arguments": {}}
+- For "Calculate HPL for ACCT-001 with FHC": {"tool": "calculate_hypothetical_pnl", "arguments": {"account_number": "ACCT-001", "hierarchy": "FHC"}}
+- For "Update PRA formula to 'Hypothetical P&L = Trading P&L + Dividend P&L'": {"tool": "update_hpl_formula", "arguments": {"hierarchy": "PRA", "new_formula": "Hypothetical P&L = Trading P&L + Dividend P&L"}}
+"""
+
+# Outermost JSON object in an LLM response (greedy, spans newlines)
+_TOOL_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def build_tool_selection_prompt(description: str, assigned_tools: list, context_str: str, query: str) -> str:
+    """Prepend the per-subtask header to the static tool-selection instructions"""
+    return f"""You are executing a subtask in a multi-step workflow.
+
+Current subtask: {description}
+Assigned tools: {assigned_tools}
+{context_str}
+
+Original query: {query}
+
+""" + _TOOL_SELECTION_PROMPT_SUFFIX
+
+
+@lru_cache(maxsize=512)
+def parse_tool_call(response_text: str):
+    """
+    Extract the JSON tool selection object from an LLM response
+    Returns None if no object is found
+    """
+    match = _TOOL_JSON_RE.search(response_text)
+    if match:
+        return orjson.loads(match.group(0))
+
+    return None
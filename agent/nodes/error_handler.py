@@ -2,97 +2,183 @@
 Error Handler Node: Implements retry logic with alternative approaches
 """
 
-from agent.agent_state import AgentState, create_reasoning_step
+import asyncio
+from agent.nodes._mcp import make_call_tool
+from agent.agent_state import AgentState, create_reasoning_step, create_tool_execution
 
 
-async def handle_errors(state: AgentState) -> dict:
+# Seconds allowed for the inline retry of a failed tool call
+INLINE_RETRY_TIMEOUT = 5
+
+
+def _retryable_errors(state: AgentState) -> list:
+    """Latest error of each subtask that is still failed and has a tool call to repeat"""
+    retryable = {}
+    for error in reversed(state["errors"]):
+        subtask_id = error.get("subtask_id")
+        if subtask_id in retryable or "arguments" not in error:
+            continue
+        subtask = state["subtasks_by_id"].get(subtask_id)
+        if subtask is not None and subtask.status == "failed":
+            retryable[subtask_id] = error
+    return list(retryable.values())
+
+
+def create_error_handler(mcp_manager):
     """
-    Attempts error recovery through retries and alternative strategies
+    Factory function that creates an error_handler node with MCP manager in closure
     """
 
-    latest_error = state["errors"][-1] if state["errors"] else None
+    # Same adapter as the tool caller, so sync managers run off the event loop
+    call_tool = make_call_tool(mcp_manager)
 
-    if not latest_error:
-        return {
-            "error_recovery_mode": False,
-            "iteration_count": state["iteration_count"] + 1
-        }
+    async def retry_call(error: dict):
+        """Re-issue a failed tool call once, returning its result or None"""
+        try:
+            return await asyncio.wait_for(
+                call_tool(error["tool"], error["arguments"]),
+                timeout=INLINE_RETRY_TIMEOUT
+            )
+        except Exception:
+            return None
 
-    retry_count = state["retry_count"]
+    async def handle_errors(state: AgentState) -> dict:
+        """
+        Attempts error recovery through retries and alternative strategies
+        """
 
-    # Reasoning about error
-    reasoning = create_reasoning_step(
-        step_type="error",
-        content=f"Encountered error: {latest_error['error']}. Attempting recovery (retry {retry_count}/{state['max_retries']})",
-        metadata=latest_error
-    )
+        latest_error = state["errors"][-1] if state["errors"] else None
 
-    # Strategy 1: Retry with same parameters (transient errors)
-    if retry_count == 0:
-        return {
-            "retry_count": retry_count + 1,
-            "reasoning_steps": [reasoning],
-            "should_continue": True,
-            "needs_replanning": False,
-            "iteration_count": state["iteration_count"] + 1
-        }
+        if not latest_error:
+            return {
+                "error_recovery_mode": False,
+                "iteration_count": state["iteration_count"] + 1
+            }
+
+        retry_count = state["retry_count"]
+
+        # Reasoning about error
+        reasoning = create_reasoning_step(
+            step_type="error",
+            content=f"Encountered error: {latest_error['error']}. Attempting recovery (retry {retry_count}/{state['max_retries']})",
+            metadata=latest_error
+        )
+
+        # Strategy 1: Retry with same parameters (transient errors)
+        if retry_count == 0:
+            # Every subtask still failing from the latest batch gets its retry, not just
+            # the last error; the retries are deterministic, so they run inline and together
+            retryable = _retryable_errors(state)
+            results = await asyncio.gather(*(retry_call(error) for error in retryable))
+
+            executions = []
+            retry_reasonings = []
+            recovered = {}
+            for error, result in zip(retryable, results):
+                if result is None:
+                    continue
+                failed_subtask = state["subtasks_by_id"][error["subtask_id"]]
+                failed_subtask.status = "completed"
+                failed_subtask.result = result
+                failed_subtask.error = None
+                recovered[failed_subtask.id] = result
+
+                executions.append(create_tool_execution(
+                    tool_name=error["tool"],
+                    arguments=error["arguments"],
+                    result=result,
+                    subtask_id=failed_subtask.id
+                ))
+                retry_reasonings.append(create_reasoning_step(
+                    step_type="error",
+                    content=f"Retry of {error['tool']} succeeded",
+                    metadata={"strategy": "inline_retry", "subtask": failed_subtask.id}
+                ))
+
+            recovered_update = {
+                "tool_executions": executions,
+                "intermediate_results": recovered,
+                "completed_subtasks": list(recovered),
+            }
+
+            if recovered and len(recovered) == len(retryable):
+                next_task_id = next(
+                    (st.id for st in state["subtasks"] if st.status == "pending"),
+                    None
+                )
+                return {
+                    "retry_count": retry_count + 1,
+                    "reasoning_steps": [reasoning] + retry_reasonings,
+                    **recovered_update,
+                    "current_task": next_task_id,
+                    "error_recovery_mode": False,
+                    "should_continue": True,
+                    "iteration_count": state["iteration_count"] + 1
+                }
 
-    # Strategy 2: Try alternative tool (if available)
-    elif retry_count == 1:
-        # Find failed subtask
-        failed_subtask = None
-        for st in state["subtasks"]:
-            if st.id == latest_error["subtask_id"]:
-                failed_subtask = st
-                break
-
-        if failed_subtask and len(failed_subtask.assigned_tools) > 1:
-            # Switch to alternative tool
-            alt_reasoning = create_reasoning_step(
-                step_type="error",
-                content="Trying alternative tool approach",
-                metadata={"strategy": "alternative_tool", "subtask": failed_subtask.id}
-            )
             return {
                 "retry_count": retry_count + 1,
-                "reasoning_steps": [reasoning, alt_reasoning],
-                "current_task": failed_subtask.id,
+                "reasoning_steps": [reasoning] + retry_reasonings,
+                **(recovered_update if recovered else {}),
                 "should_continue": True,
+                "needs_replanning": False,
                 "iteration_count": state["iteration_count"] + 1
             }
-        else:
-            # No alternative tool available, skip to next strategy
+
+        # Strategy 2: Try alternative tool (if available)
+        elif retry_count == 1:
+            # Find failed subtask
+            failed_subtask = state["subtasks_by_id"].get(latest_error["subtask_id"])
+
+            if failed_subtask and len(failed_subtask.assigned_tools) > 1:
+                # Switch to alternative tool
+                alt_reasoning = create_reasoning_step(
+                    step_type="error",
+                    content="Trying alternative tool approach",
+                    metadata={"strategy": "alternative_tool", "subtask": failed_subtask.id}
+                )
+                return {
+                    "retry_count": retry_count + 1,
+                    "reasoning_steps": [reasoning, alt_reasoning],
+                    "current_task": failed_subtask.id,
+                    "should_continue": True,
+                    "iteration_count": state["iteration_count"] + 1
+                }
+            else:
+                # No alternative tool available, skip to next strategy
+                return {
+                    "retry_count": retry_count + 2,  # Skip strategy 2
+                    "reasoning_steps": [reasoning],
+                    "should_continue": True,
+                    "iteration_count": state["iteration_count"] + 1
+                }
+
+        # Strategy 3: Replan with different subtasks
+        elif retry_count == 2:
+            replan_reasoning = create_reasoning_step(
+                step_type="error",
+                content="Replanning query with different approach",
+                metadata={"strategy": "replan"}
+            )
             return {
-                "retry_count": retry_count + 2,  # Skip strategy 2
-                "reasoning_steps": [reasoning],
+                "retry_count": retry_count + 1,
+                "reasoning_steps": [reasoning, replan_reasoning],
+                "needs_replanning": True,
                 "should_continue": True,
                 "iteration_count": state["iteration_count"] + 1
             }
 
-    # Strategy 3: Replan with different subtasks
-    elif retry_count == 2:
-        replan_reasoning = create_reasoning_step(
+        # Give up after max retries
+        final_reasoning = create_reasoning_step(
             step_type="error",
-            content="Replanning query with different approach",
-            metadata={"strategy": "replan"}
+            content="Max retries exceeded. Proceeding with partial results.",
+            metadata={"strategy": "give_up", "retry_count": retry_count}
         )
         return {
-            "retry_count": retry_count + 1,
-            "reasoning_steps": [reasoning, replan_reasoning],
-            "needs_replanning": True,
+            "error_recovery_mode": False,
+            "reasoning_steps": [reasoning, final_reasoning],
             "should_continue": True,
             "iteration_count": state["iteration_count"] + 1
         }
 
-    # Give up after max retries
-    final_reasoning = create_reasoning_step(
-        step_type="error",
-        content="Max retries exceeded. Proceeding with partial results.",
-        metadata={"strategy": "give_up", "retry_count": retry_count}
-    )
-    return {
-        "error_recovery_mode": False,
-        "reasoning_steps": [reasoning, final_reasoning],
-        "should_continue": True,
-        "iteration_count": state["iteration_count"] + 1
-    }
+    return handle_errors
@@ -2,25 +2,27 @@
 Planner Node: Decomposes complex queries into actionable subtasks
 """
 
-import json
-from langchain_anthropic import ChatAnthropic
+import asyncio
+import re
+import orjson
+from functools import lru_cache
 from langchain_core.messages import HumanMessage
+from agent.nodes._llm import get_llm
 from agent.agent_state import AgentState, create_subtask, create_reasoning_step
+from agent.nodes._tool_selection import build_tool_selection_prompt, parse_tool_call
 
 
-async def plan_tasks(state: AgentState) -> dict:
-    """
-    Analyzes the query and creates a structured task plan
-    Uses LLM to identify required tools and execution sequence
-    """
+# Static planning prompt sections; only the query and tool list vary per call
+_PLANNER_PROMPT_PREFIX = """Analyze this financial query and break it down into specific subtasks.
 
-    # Create planning prompt
-    planning_prompt = f"""Analyze this financial query and break it down into specific subtasks.
+Query: """
 
-Query: {state['original_query']}
+_PLANNER_PROMPT_MIDDLE = """
 
 Available tools:
-{', '.join(state['available_tools'])}
+"""
+
+_PLANNER_PROMPT_SUFFIX = """
 
 Tool descriptions:
 - get_hpl_formula(hierarchy): Get the HPL formula for a specific hierarchy (FHC or PRA)
@@ -41,49 +43,130 @@ For complex queries involving multiple accounts or hierarchies, break into logic
 
 Respond ONLY with a valid JSON array in this exact format:
 [
-  {{
+  {
     "id": "task_1",
     "description": "Brief description of what to do",
-    "tools": ["tool_name"]
-  }},
-  {{
+    "tools": ["tool_name"],
+    "dependencies": []
+  },
+  {
     "id": "task_2",
-    "description": "Another task",
-    "tools": ["tool_name"]
-  }}
+    "description": "Another task that uses the result of task_1",
+    "tools": ["tool_name"],
+    "dependencies": ["task_1"]
+  }
 ]
 
+List in "dependencies" the ids of every earlier task whose result this task needs.
+Use an empty list for tasks that can run independently.
+
 Examples:
-- Query "What hierarchies are available?" → [{{ "id": "task_1", "description": "Get all available hierarchies", "tools": ["get_all_hierarchies"] }}]
-- Query "Calculate HPL for ACCT-001 with FHC" → [{{ "id": "task_1", "description": "Calculate HPL for ACCT-001 using FHC hierarchy", "tools": ["calculate_hypothetical_pnl"] }}]
+- Query "What hierarchies are available?" → [{ "id": "task_1", "description": "Get all available hierarchies", "tools": ["get_all_hierarchies"], "dependencies": [] }]
+- Query "Calculate HPL for ACCT-001 with FHC" → [{ "id": "task_1", "description": "Calculate HPL for ACCT-001 using FHC hierarchy", "tools": ["calculate_hypothetical_pnl"], "dependencies": [] }]
 """
 
-    # LLM call to generate plan
-    llm = ChatAnthropic(model="claude-sonnet-4-5", temperature=0)
-    response = await llm.ainvoke([HumanMessage(content=planning_prompt)])
+# Outermost JSON array in an LLM response (greedy, spans newlines)
+_PLAN_JSON_RE = re.compile(r'\[.*\]', re.DOTALL)
+
+# Parsed plans keyed by (query, tools, retry_count) so repeat queries skip the LLM call
+_PLAN_CACHE_MAXSIZE = 512
+_plan_cache = {}
+
+
+@lru_cache(maxsize=512)
+def _parse_plan(response_text: str) -> tuple:
+    """
+    Extract the JSON task array from an LLM response
+    Returns an empty tuple if no array is found
+    """
+    match = _PLAN_JSON_RE.search(response_text)
+    if match:
+        return tuple(orjson.loads(match.group(0)))
+
+    return ()
+
+
+@lru_cache(maxsize=32)
+def _format_tools(available_tools: tuple) -> str:
+    """Join tool names once per distinct tool set"""
+    return ', '.join(available_tools)
+
+
+def _cache_plan(key: tuple, tasks_data: tuple):
+    """Store a parsed plan, evicting the oldest entry when full"""
+    if len(_plan_cache) >= _PLAN_CACHE_MAXSIZE:
+        _plan_cache.pop(next(iter(_plan_cache)))
+    _plan_cache[key] = tasks_data
+
+
+async def plan_tasks(state: AgentState) -> dict:
+    """
+    Analyzes the query and creates a structured task plan
+    Uses LLM to identify required tools and execution sequence
+    """
+
+    available_tools = tuple(state['available_tools'])
+
+    # Retry count is part of the key so replanning after errors always hits the LLM
+    cache_key = (state['original_query'], available_tools, state['retry_count'])
+
+    tasks_data = _plan_cache.get(cache_key)
+    speculative_tool_call = None
+
+    # LLM call to generate plan (skipped on cache hit)
+    if tasks_data is None:
+        planning_prompt = (
+            _PLANNER_PROMPT_PREFIX + state['original_query'] +
+            _PLANNER_PROMPT_MIDDLE + _format_tools(available_tools) +
+            _PLANNER_PROMPT_SUFFIX
+        )
+        # Speculatively select a tool for the whole query as if it were a single subtask
+        speculative_prompt = build_tool_selection_prompt(
+            f"Address query: {state['original_query']}",
+            list(available_tools),
+            "",
+            state['original_query']
+        )
+
+        llm = get_llm(temperature=0)
+        response, speculative_response = await asyncio.gather(
+            llm.ainvoke([HumanMessage(content=planning_prompt)]),
+            llm.ainvoke([HumanMessage(content=speculative_prompt)]),
+            return_exceptions=True
+        )
+        if isinstance(response, BaseException):
+            raise response
+
+        # A failed speculation just means tool_caller makes its own LLM call
+        try:
+            if not isinstance(speculative_response, BaseException):
+                speculative_tool_call = parse_tool_call(speculative_response.content)
+        except Exception:
+            speculative_tool_call = None
 
     # Parse subtasks from LLM response
     subtasks = []
+    planned_tools = set()
     try:
-        # Extract JSON from response
-        response_text = response.content
-
-        # Try to find JSON array in response
-        start_idx = response_text.find('[')
-        end_idx = response_text.rfind(']') + 1
-
-        if start_idx != -1 and end_idx > start_idx:
-            json_str = response_text[start_idx:end_idx]
-            tasks_data = json.loads(json_str)
+        if tasks_data is None:
+            # Extract JSON from response
+            tasks_data = _parse_plan(response.content)
 
+        if tasks_data:
             # Create SubTask objects
             for task_data in tasks_data:
+                # Without explicit dependencies, assume the task needs every earlier one
                 subtask = create_subtask(
                     task_id=task_data['id'],
                     description=task_data['description'],
-                    assigned_tools=task_data.get('tools', [])
+                    assigned_tools=task_data.get('tools', []),
+                    dependencies=task_data.get('dependencies', [st.id for st in subtasks])
                 )
                 subtasks.append(subtask)
+                planned_tools.update(subtask.assigned_tools)
+
+            # Only cache plans that produced valid subtasks
+            _cache_plan(cache_key, tasks_data)
         else:
             # Fallback: create a single generic task
             subtasks = [
@@ -93,6 +176,7 @@ Examples:
                     assigned_tools=state['available_tools']
                 )
             ]
+            planned_tools = set(state['available_tools'])
 
     except Exception as e:
         # Fallback: create a single task if parsing fails
@@ -104,6 +188,7 @@ Examples:
                 assigned_tools=state['available_tools']
             )
         ]
+        planned_tools = set(state['available_tools'])
 
     # Add reasoning step for UI
     reasoning = create_reasoning_step(
@@ -114,13 +199,12 @@ Examples:
     )
 
     # Determine if validation is needed (for HPL calculations)
-    needs_validation = any(
-        "calculate_hypothetical_pnl" in task.assigned_tools
-        for task in subtasks
-    )
+    needs_validation = "calculate_hypothetical_pnl" in planned_tools
 
     return {
         "subtasks": subtasks,
+        "subtasks_by_id": {st.id: st for st in subtasks},
+        "speculative_tool_call": speculative_tool_call,
         "reasoning_steps": [reasoning],
         "current_task": subtasks[0].id if subtasks else None,
         "iteration_count": state["iteration_count"] + 1,
@@ -2,8 +2,8 @@
 Synthesizer Node: Aggregates all results into comprehensive final answer
 """
 
-from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage
+from agent.nodes._llm import get_llm
 from agent.agent_state import AgentState, create_reasoning_step
 
 
@@ -23,9 +23,10 @@ async def synthesize_answer(state: AgentState) -> dict:
             }
 
     # Format results for synthesis
-    results_text = ""
-    for task_id, data in all_results.items():
-        results_text += f"\n{task_id}: {data['description']}\nResult: {data['result']}\n"
+    results_text = "".join(
+        f"\n{task_id}: {data['description']}\nResult: {data['result']}\n"
+        for task_id, data in all_results.items()
+    )
 
     # Format tool executions
     tools_used = []
@@ -37,12 +38,14 @@ async def synthesize_answer(state: AgentState) -> dict:
         })
 
     # Format validation results
-    validation_text = ""
-    if state["validation_results"]:
-        for val in state["validation_results"]:
-            validation_text += f"\n- Confidence: {val.confidence:.2f}, Valid: {val.is_valid}"
-            if val.issues:
-                validation_text += f", Issues: {', '.join(val.issues)}"
+    validation_parts = []
+    for val in state["validation_results"]:
+        validation_parts.append(f"\n- Confidence: {val.confidence:.2f}, Valid: {val.is_valid}")
+        if val.issues:
+            validation_parts.append(f", Issues: {', '.join(val.issues)}")
+    validation_text = "".join(validation_parts)
+
+    tools_text = "\n".join(f"- {t['tool']}({t['args']}): {t['result']}" for t in tools_used)
 
     # Create synthesis prompt
     synthesis_prompt = f"""Synthesize a comprehensive answer to the user's query based on the workflow results.
@@ -54,7 +57,7 @@ Completed subtasks and their results:
 
 Tool executions performed:
 {len(tools_used)} tool calls were made:
-{chr(10).join([f"- {t['tool']}({t['args']}): {t['result']}" for t in tools_used])}
+{tools_text}
 
 Validation results:
 {validation_text if validation_text else "No validation was performed"}
@@ -69,7 +72,7 @@ Provide a comprehensive answer that:
 Do not include any preamble or meta-commentary about the workflow - just provide the answer to the user's query.
 """
 
-    llm = ChatAnthropic(model="claude-sonnet-4-5", temperature=0.3)
+    llm = get_llm(temperature=0.3)
     response = await llm.ainvoke([HumanMessage(content=synthesis_prompt)])
 
     final_answer = response.content
@@ -80,7 +83,7 @@ Do not include any preamble or meta-commentary about the workflow - just provide
         content="Synthesized final answer from all subtask results",
         metadata={
             "subtasks_completed": len(all_results),
-            "tools_used": list(set(e.tool_name for e in state["tool_executions"])),
+            "tools_used": list({e.tool_name for e in state["tool_executions"]}),
             "total_tool_calls": len(state["tool_executions"])
         }
     )
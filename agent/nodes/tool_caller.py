@@ -2,30 +2,249 @@
 Tool Caller Node: Executes MCP tools based on current subtask
 """
 
-import json
-from langchain_anthropic import ChatAnthropic
+import asyncio
+import orjson
 from langchain_core.messages import HumanMessage
+from agent.nodes._llm import chunk_text, get_llm
+from agent.nodes._mcp import make_call_tool
+from agent.nodes._tool_selection import build_tool_selection_prompt, parse_tool_call
 from agent.agent_state import AgentState, create_tool_execution, create_reasoning_step
 
 
+# Upper bound on subtasks dispatched concurrently in one tool_caller step
+MAX_CONCURRENT_SUBTASKS = 5
+
+# Parsed tool selections keyed by (description, assigned_tools, context, query)
+_TOOL_CACHE_MAXSIZE = 512
+_tool_selection_cache = {}
+
+
+class _StreamedToolCallParser:
+    """
+    Incrementally scans streamed text for the tool selection JSON object
+    Chunks are kept as parts and each character is scanned once, so parsing
+    stays linear in the response length instead of rescanning the whole text
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.length = 0
+        self.start = -1
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def feed(self, chunk: str):
+        """
+        Add a chunk and return the tool selection once its outermost object closes
+        Returns None while the object is still incomplete or unparseable
+        """
+        base = self.length
+        self.parts.append(chunk)
+        self.length += len(chunk)
+        if self.done:
+            return None
+
+        for offset, char in enumerate(chunk):
+            if self.start == -1:
+                if char == '{':
+                    self.start = base + offset
+                    self.depth = 1
+            elif self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.done = True
+                    try:
+                        tool_data = orjson.loads(self.text[self.start:base + offset + 1])
+                    except ValueError:
+                        return None
+                    return tool_data if isinstance(tool_data, dict) and 'tool' in tool_data else None
+
+        return None
+
+
+def _cache_tool_selection(key: tuple, tool_data: dict):
+    """Store a parsed tool selection, evicting the oldest entry when full"""
+    if len(_tool_selection_cache) >= _TOOL_CACHE_MAXSIZE:
+        _tool_selection_cache.pop(next(iter(_tool_selection_cache)))
+    _tool_selection_cache[key] = tool_data
+
+
 def create_tool_caller(mcp_manager):
     """
     Factory function that creates a tool_caller node with MCP manager in closure
     This avoids state serialization issues
     """
 
+    # Sync MCP clients would block the event loop and serialize concurrent subtasks
+    call_tool = make_call_tool(mcp_manager)
+
+    async def run_subtask(
+        subtask,
+        context_str: str,
+        query: str,
+        semaphore: asyncio.Semaphore,
+        preselected: dict = None
+    ) -> dict:
+        """
+        Selects and executes the tool for a single subtask
+        Updates the subtask status in place and returns its execution records
+        A preselected tool selection skips the LLM call entirely
+        """
+
+        tool_executions = []
+        reasoning_steps = []
+        errors = []
+
+        async with semaphore:
+            # Context is part of the key since dependent subtasks resolve differently, and the
+            # query since the LLM fills arguments (accounts, formulas) the description omits
+            cache_key = (subtask.description, frozenset(subtask.assigned_tools), context_str, query)
+            tool_data = preselected or _tool_selection_cache.get(cache_key)
+
+            # MCP call dispatched while the selection was still streaming
+            early_call = None
+
+            try:
+                # LLM call for tool selection (skipped on cache hit)
+                if tool_data is None:
+                    tool_selection_prompt = build_tool_selection_prompt(
+                        subtask.description,
+                        subtask.assigned_tools,
+                        context_str,
+                        query
+                    )
+                    llm = get_llm(temperature=0)
+
+                    # Stream the selection so the MCP call starts as soon as the JSON object closes
+                    parser = _StreamedToolCallParser()
+                    try:
+                        async for chunk in llm.astream([HumanMessage(content=tool_selection_prompt)]):
+                            streamed = parser.feed(chunk_text(chunk.content))
+
+                            # The parser yields the selection at most once
+                            if streamed is not None:
+                                tool_data = streamed
+                                tool_args = dict(streamed.get('arguments', {}))
+                                early_call = asyncio.create_task(
+                                    call_tool(streamed.get('tool'), tool_args)
+                                )
+                    except BaseException:
+                        # Don't leave a call dispatched from a broken stream running detached
+                        if early_call is not None:
+                            early_call.cancel()
+                        raise
+
+                if tool_data is None:
+                    # Parse tool selection from the full response
+                    tool_data = parse_tool_call(parser.text)
+                    if tool_data is not None:
+                        _cache_tool_selection(cache_key, tool_data)
+                elif early_call is not None:
+                    _cache_tool_selection(cache_key, tool_data)
+
+                if tool_data is not None:
+                    tool_name = tool_data.get('tool')
+                    if early_call is None:
+                        tool_args = dict(tool_data.get('arguments', {}))
+
+                    # Log reasoning
+                    reasoning_steps.append(create_reasoning_step(
+                        step_type="tool_call",
+                        content=f"Calling {tool_name} with args: {tool_args}",
+                        metadata={"subtask_id": subtask.id, "tool": tool_name, "args": tool_args}
+                    ))
+
+                    # Execute via MCP
+                    try:
+                        if early_call is not None:
+                            result = await early_call
+                        else:
+                            result = await call_tool(tool_name, tool_args)
+
+                        # Track execution
+                        execution = create_tool_execution(
+                            tool_name=tool_name,
+                            arguments=tool_args,
+                            result=result,
+                            subtask_id=subtask.id
+                        )
+
+                        tool_executions.append(execution)
+
+                        # Mark subtask as completed
+                        subtask.status = "completed"
+                        subtask.result = result
+
+                    except Exception as e:
+                        # Don't replay a selection that failed on retry
+                        _tool_selection_cache.pop(cache_key, None)
+                        error = {
+                            "subtask_id": subtask.id,
+                            "tool": tool_name,
+                            "arguments": tool_args,
+                            "error": str(e),
+                            "timestamp": ""
+                        }
+                        errors.append(error)
+                        subtask.status = "failed"
+                        subtask.error = str(e)
+
+                else:
+                    # Could not parse tool selection
+                    error = {
+                        "subtask_id": subtask.id,
+                        "tool": "unknown",
+                        "error": "Failed to parse tool selection from LLM response",
+                        "timestamp": ""
+                    }
+                    errors.append(error)
+                    subtask.status = "failed"
+                    subtask.error = "Failed to parse tool selection"
+
+            except Exception as e:
+                # A stream or API failure fails only this subtask, not its batch siblings;
+                # the error handler then takes over as for a failed tool call
+                error = {
+                    "subtask_id": subtask.id,
+                    "tool": "unknown",
+                    "error": str(e),
+                    "timestamp": ""
+                }
+                errors.append(error)
+                subtask.status = "failed"
+                subtask.error = str(e)
+
+        return {
+            "tool_executions": tool_executions,
+            "reasoning_steps": reasoning_steps,
+            "errors": errors
+        }
+
     async def execute_tools(state: AgentState) -> dict:
         """
         Executes tools for the current subtask
-        Handles tool selection, argument preparation, and execution
+        Independent pending subtasks whose dependencies are complete run concurrently
         """
 
         # Find current subtask
-        current_subtask = None
-        for st in state["subtasks"]:
-            if st.id == state["current_task"]:
-                current_subtask = st
-                break
+        current_subtask = state["subtasks_by_id"].get(state["current_task"])
 
         if not current_subtask:
             # No current task - move to next pending subtask
@@ -41,8 +260,18 @@ def create_tool_caller(mcp_manager):
                 "iteration_count": state["iteration_count"] + 1
             }
 
-        # Mark subtask as in progress
-        current_subtask.status = "in_progress"
+        # Batch the current subtask with every other ready subtask
+        completed_ids = {st.id for st in state["subtasks"] if st.status == "completed"}
+        batch = [current_subtask] + [
+            st for st in state["subtasks"]
+            if st is not current_subtask
+            and st.status == "pending"
+            and all(dep in completed_ids for dep in st.dependencies)
+        ]
+
+        # Mark subtasks as in progress
+        for st in batch:
+            st.status = "in_progress"
 
         # Build context from previous results
         context_str = ""
@@ -51,148 +280,54 @@ def create_tool_caller(mcp_manager):
             for task_id, result in state["intermediate_results"].items():
                 context_str += f"- {task_id}: {result}\n"
 
-        # Use LLM to determine exact tool calls needed
-        tool_selection_prompt = f"""You are executing a subtask in a multi-step workflow.
-
-Current subtask: {current_subtask.description}
-Assigned tools: {current_subtask.assigned_tools}
-{context_str}
-
-Original query: {state['original_query']}
-
-Based on this subtask, determine which tool to call and with what arguments.
-
-Available tools and their EXACT parameters (use these exact names):
-- get_hpl_formula(hierarchy: str) - hierarchy must be "FHC" or "PRA"
-- update_hpl_formula(hierarchy: str, new_formula: str) - IMPORTANT: parameter is "new_formula" not "formula". The formula MUST include the full equation with "Hypothetical P&L = " on the left side.
-- get_all_hierarchies() - no parameters
-- get_all_accounts() - no parameters
-- get_account_pnl(account_number: str) - provide account number like "ACCT-001"
-- calculate_hypothetical_pnl(account_number: str, hierarchy: str) - provide account number and hierarchy (FHC or PRA)
-
-CRITICAL:
-1. Use the EXACT parameter names shown above. For update_hpl_formula, the parameter is "new_formula" NOT "formula".
-2. When updating formulas, PRESERVE the complete equation including "Hypothetical P&L = " before the calculation. DO NOT extract only the right-hand side.
-
-Respond ONLY with a valid JSON object in this exact format:
-{{
-  "tool": "tool_name",
-  "arguments": {{"arg_name": "arg_value"}}
-}}
-
-Examples:
-- For "Get all hierarchies": {{"tool": "get_all_hierarchies", "arguments": {{}}}}
-- For "Calculate HPL for ACCT-001 with FHC": {{"tool": "calculate_hypothetical_pnl", "arguments": {{"account_number": "ACCT-001", "hierarchy": "FHC"}}}}
-- For "Update PRA formula to 'Hypothetical P&L = Trading P&L + Dividend P&L'": {{"tool": "update_hpl_formula", "arguments": {{"hierarchy": "PRA", "new_formula": "Hypothetical P&L = Trading P&L + Dividend P&L"}}}}
-"""
-
-        llm = ChatAnthropic(model="claude-sonnet-4-5", temperature=0)
-        response = await llm.ainvoke([HumanMessage(content=tool_selection_prompt)])
+        # Reuse the planner's speculative selection for single-subtask plans it matches
+        speculative = state.get("speculative_tool_call")
+        preselected = None
+        if (
+            speculative
+            and len(state["subtasks"]) == 1
+            and not context_str
+            and speculative.get('tool') in current_subtask.assigned_tools
+        ):
+            preselected = speculative
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SUBTASKS)
+        outcomes = await asyncio.gather(*[
+            run_subtask(
+                st,
+                context_str,
+                state['original_query'],
+                semaphore,
+                preselected if st is current_subtask else None
+            )
+            for st in batch
+        ])
 
         tool_executions = []
+        reasoning_steps = []
         errors = []
-        result_data = None
-
-        try:
-            # Parse tool selection from response
-            response_text = response.content
-
-            # Extract JSON from response
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx]
-                tool_data = json.loads(json_str)
-
-                tool_name = tool_data.get('tool')
-                tool_args = tool_data.get('arguments', {})
-
-                # Log reasoning
-                reasoning = create_reasoning_step(
-                    step_type="tool_call",
-                    content=f"Calling {tool_name} with args: {tool_args}",
-                    metadata={"subtask_id": current_subtask.id, "tool": tool_name, "args": tool_args}
-                )
-
-                # Execute via MCP
-                try:
-                    result = await mcp_manager.call_tool(tool_name, tool_args)
-                    result_data = result
-
-                    # Track execution
-                    execution = create_tool_execution(
-                        tool_name=tool_name,
-                        arguments=tool_args,
-                        result=result,
-                        subtask_id=current_subtask.id
-                    )
-
-                    tool_executions.append(execution)
-
-                    # Store in intermediate results
-                    state["intermediate_results"][current_subtask.id] = result
-
-                    # Mark subtask as completed
-                    current_subtask.status = "completed"
-                    current_subtask.result = result
-
-                except Exception as e:
-                    error = {
-                        "subtask_id": current_subtask.id,
-                        "tool": tool_name,
-                        "error": str(e),
-                        "timestamp": execution.timestamp if 'execution' in locals() else ""
-                    }
-                    errors.append(error)
-                    current_subtask.status = "failed"
-                    current_subtask.error = str(e)
-
-            else:
-                # Could not parse tool selection
-                error = {
-                    "subtask_id": current_subtask.id,
-                    "tool": "unknown",
-                    "error": "Failed to parse tool selection from LLM response",
-                    "timestamp": ""
-                }
-                errors.append(error)
-                current_subtask.status = "failed"
-                current_subtask.error = "Failed to parse tool selection"
-
-        except Exception as e:
-            error = {
-                "subtask_id": current_subtask.id,
-                "tool": "unknown",
-                "error": str(e),
-                "timestamp": ""
-            }
-            errors.append(error)
-            current_subtask.status = "failed"
-            current_subtask.error = str(e)
-
-        # Determine next task
-        next_task_id = None
-        completed_tasks = state["completed_subtasks"] if current_subtask.status == "completed" else state["completed_subtasks"]
+        for outcome in outcomes:
+            tool_executions.extend(outcome["tool_executions"])
+            reasoning_steps.extend(outcome["reasoning_steps"])
+            errors.extend(outcome["errors"])
 
-        if current_subtask.status == "completed":
-            completed_tasks = completed_tasks + [current_subtask.id]
+        # Only the new results are returned; the state reducer merges them
+        completed_batch = [st for st in batch if st.status == "completed"]
+        new_results = {st.id: st.result for st in completed_batch}
 
-        # Find next pending task
-        for st in state["subtasks"]:
-            if st.status == "pending":
-                next_task_id = st.id
-                break
+        # Determine next pending task
+        next_task_id = next((st.id for st in state["subtasks"] if st.status == "pending"), None)
 
         return {
             "tool_executions": tool_executions,
-            "reasoning_steps": [reasoning] if 'reasoning' in locals() else [],
+            "reasoning_steps": reasoning_steps,
             "errors": errors,
             "error_recovery_mode": len(errors) > 0,
             "iteration_count": state["iteration_count"] + 1,
             "current_task": next_task_id,
-            "completed_subtasks": [current_subtask.id] if current_subtask.status == "completed" else [],
-            "intermediate_results": state["intermediate_results"]
+            "completed_subtasks": [st.id for st in completed_batch],
+            "speculative_tool_call": None,
+            "intermediate_results": new_results
         }
 
     return execute_tools
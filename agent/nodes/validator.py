@@ -2,7 +2,96 @@
 Validator Node: Cross-validates financial calculations
 """
 
-from agent.agent_state import AgentState, ValidationResult, create_reasoning_step
+import asyncio
+import time
+from hashlib import blake2b
+from agent.agent_state import AgentState, create_validation_result, create_reasoning_step
+
+
+# Alternative-hierarchy results keyed by (account_number, hierarchy) -> (fetched_at, result)
+ALT_RESULT_TTL_SECONDS = 60
+_ALT_RESULT_CACHE_MAXSIZE = 512
+_alt_result_cache = {}
+
+# Fingerprints of HPL results already cross-checked, keyed by (account_number, hierarchy)
+# -> (validated_at, fingerprint); trusted for VALIDATED_TTL_SECONDS
+VALIDATED_TTL_SECONDS = 300
+_VALIDATED_CACHE_MAXSIZE = 512
+_validated_fingerprints = {}
+
+# update_hpl_formula executions already acted on, as (hierarchy, timestamp, subtask_id)
+_seen_formula_updates = set()
+
+
+def _truncate(value, limit: int = 200) -> str:
+    """Stringify a tool result once and cut it to the preview length"""
+    text = value if isinstance(value, str) else str(value)
+    return text[:limit] if len(text) > limit else text
+
+
+def _fingerprint(value) -> str:
+    """Content hash of a tool result"""
+    return blake2b(str(value).encode(), digest_size=16).hexdigest()
+
+
+def _remember_validated(key: tuple, fingerprint: str):
+    """Record a cross-checked result, evicting the oldest entry when full"""
+    if key not in _validated_fingerprints and len(_validated_fingerprints) >= _VALIDATED_CACHE_MAXSIZE:
+        del _validated_fingerprints[next(iter(_validated_fingerprints))]
+    _validated_fingerprints[key] = (time.monotonic(), fingerprint)
+
+
+def _remember_alt_result(key: tuple, result):
+    """Store an alternative-hierarchy result, evicting expired entries and then the oldest when full"""
+    now = time.monotonic()
+    # Insertion order is fetch order, so expired entries sit at the front
+    while _alt_result_cache:
+        oldest = next(iter(_alt_result_cache))
+        if now - _alt_result_cache[oldest][0] < ALT_RESULT_TTL_SECONDS:
+            break
+        del _alt_result_cache[oldest]
+    _alt_result_cache.pop(key, None)
+    if len(_alt_result_cache) >= _ALT_RESULT_CACHE_MAXSIZE:
+        del _alt_result_cache[next(iter(_alt_result_cache))]
+    _alt_result_cache[key] = (now, result)
+
+
+def _is_validated(key: tuple, fingerprint: str) -> bool:
+    """Whether this exact result was cross-checked within the TTL"""
+    entry = _validated_fingerprints.get(key)
+    if entry is None:
+        return False
+    if time.monotonic() - entry[0] >= VALIDATED_TTL_SECONDS:
+        del _validated_fingerprints[key]
+        return False
+    return entry[1] == fingerprint
+
+
+def _forget_updated_formulas(tool_executions) -> set:
+    """
+    Drop cached validations once a formula update shows up in the executions
+    Any hierarchy can be the alternative side of a cross-check, so all fingerprints go;
+    cached alternative results go only for the updated hierarchies
+
+    Returns:
+        Hierarchies whose formula was newly updated
+    """
+    updated = set()
+    for execution in tool_executions:
+        if execution.tool_name != "update_hpl_formula" or execution.error:
+            continue
+        marker = (execution.arguments.get("hierarchy"), execution.timestamp, execution.subtask_id)
+        if marker not in _seen_formula_updates:
+            _seen_formula_updates.add(marker)
+            updated.add(marker[0])
+
+    if updated:
+        _validated_fingerprints.clear()
+        for key in [key for key in _alt_result_cache if key[1] in updated]:
+            del _alt_result_cache[key]
+        if len(_seen_formula_updates) > _VALIDATED_CACHE_MAXSIZE:
+            _seen_formula_updates.clear()
+    return updated
 
 
 def create_validator(mcp_manager):
@@ -10,12 +99,98 @@ def create_validator(mcp_manager):
     Factory function that creates a validator node with MCP manager in closure
     """
 
+    async def fetch_alt_result(account_number: str, hierarchy: str):
+        """Calculate HPL under the alternative hierarchy, reusing recent results"""
+        key = (account_number, hierarchy)
+        cached = _alt_result_cache.get(key)
+        if cached and time.monotonic() - cached[0] < ALT_RESULT_TTL_SECONDS:
+            return cached[1]
+
+        result = await mcp_manager.call_tool(
+            "calculate_hypothetical_pnl",
+            {
+                "account_number": account_number,
+                "hierarchy": hierarchy
+            }
+        )
+        _remember_alt_result(key, result)
+        return result
+
+    async def validate_one(execution, alt_calls: dict, fingerprint: str, cached: bool) -> tuple:
+        """
+        Cross-checks a single HPL execution against the alternative hierarchy
+        Returns a (ValidationResult, ReasoningStep) pair and never raises
+        """
+        reasoning = create_reasoning_step(
+            step_type="validation",
+            content=f"Cross-validating results from {execution.tool_name}",
+            metadata={"tool": execution.tool_name, "account": execution.arguments.get("account_number")}
+        )
+
+        # Cross-check with alternative hierarchy
+        original_hierarchy = execution.arguments.get("hierarchy")
+        alt_hierarchy = "PRA" if original_hierarchy == "FHC" else "FHC"
+        validated_key = (execution.arguments.get("account_number"), original_hierarchy)
+
+        # Identical result already cross-checked - skip the alternative call
+        if cached:
+            validation = create_validation_result(
+                is_valid=True,
+                confidence=0.95,
+                cross_check_results={
+                    "original": {
+                        "hierarchy": original_hierarchy,
+                        "result": _truncate(execution.result)
+                    },
+                    "cached": True
+                }
+            )
+            return validation, reasoning
+
+        try:
+            alt_result = await alt_calls[(execution.arguments["account_number"], alt_hierarchy)]
+
+            # Simple consistency check - both should return results
+            is_consistent = (execution.result is not None) and (alt_result is not None)
+
+            validation = create_validation_result(
+                is_valid=is_consistent,
+                confidence=0.95 if is_consistent else 0.6,
+                issues=[] if is_consistent else ["Alternative hierarchy produced different result structure"],
+                cross_check_results={
+                    "original": {
+                        "hierarchy": original_hierarchy,
+                        "result": _truncate(execution.result)
+                    },
+                    "alternative": {
+                        "hierarchy": alt_hierarchy,
+                        "result": _truncate(alt_result)
+                    }
+                }
+            )
+            if is_consistent:
+                _remember_validated(validated_key, fingerprint)
+
+        except Exception as e:
+            # Validation failed - lower confidence but don't fail
+            validation = create_validation_result(
+                is_valid=True,  # Assume valid but with lower confidence
+                confidence=0.7,
+                issues=[f"Cross-validation failed: {str(e)}"],
+                cross_check_results={}
+            )
+
+        return validation, reasoning
+
     async def validate_results(state: AgentState) -> dict:
         """
         Cross-validates results using multiple approaches
         Checks consistency across different hierarchies or data sources
         """
 
+        # A formula update changes what either hierarchy computes
+        _forget_updated_formulas(state["tool_executions"])
+
         # Identify results that need validation (HPL calculations)
         results_to_validate = [
             exec for exec in state["tool_executions"]
@@ -35,75 +210,51 @@ def create_validator(mcp_manager):
                 "iteration_count": state["iteration_count"] + 1
             }
 
-        validation_results = []
-
-        for execution in results_to_validate:
-            reasoning = create_reasoning_step(
-                step_type="validation",
-                content=f"Cross-validating results from {execution.tool_name}",
-                metadata={"tool": execution.tool_name, "account": execution.arguments.get("account_number")}
-            )
+        # One alternative-hierarchy call per distinct (account, hierarchy), shared by
+        # every execution that needs it and issued concurrently
+        alt_calls = {}
+        fingerprints = [_fingerprint(e.result) for e in results_to_validate]
+        cached_flags = [
+            _is_validated((e.arguments.get("account_number"), e.arguments.get("hierarchy")), fingerprint)
+            for e, fingerprint in zip(results_to_validate, fingerprints)
+        ]
+        for execution, cached in zip(results_to_validate, cached_flags):
+            account_number = execution.arguments.get("account_number")
+            if cached:
+                continue
+            alt_hierarchy = "PRA" if execution.arguments.get("hierarchy") == "FHC" else "FHC"
+            key = (account_number, alt_hierarchy)
+            if account_number is not None and key not in alt_calls:
+                alt_calls[key] = asyncio.ensure_future(fetch_alt_result(account_number, alt_hierarchy))
 
-            # Cross-check with alternative hierarchy
-            original_hierarchy = execution.arguments.get("hierarchy")
-            alt_hierarchy = "PRA" if original_hierarchy == "FHC" else "FHC"
+        pairs = await asyncio.gather(*[
+            validate_one(e, alt_calls, fingerprint, cached)
+            for e, fingerprint, cached in zip(results_to_validate, fingerprints, cached_flags)
+        ])
+        validation_results = [validation for validation, _ in pairs]
+        reasoning_steps = [reasoning for _, reasoning in pairs]
 
-            try:
-                alt_result = await mcp_manager.call_tool(
-                    "calculate_hypothetical_pnl",
-                    {
-                        "account_number": execution.arguments["account_number"],
-                        "hierarchy": alt_hierarchy
-                    }
-                )
-
-                # Simple consistency check - both should return results
-                is_consistent = (execution.result is not None) and (alt_result is not None)
-
-                validation = ValidationResult(
-                    is_valid=is_consistent,
-                    confidence=0.95 if is_consistent else 0.6,
-                    issues=[] if is_consistent else ["Alternative hierarchy produced different result structure"],
-                    cross_check_results={
-                        "original": {
-                            "hierarchy": original_hierarchy,
-                            "result": execution.result[:200] if len(str(execution.result)) > 200 else execution.result
-                        },
-                        "alternative": {
-                            "hierarchy": alt_hierarchy,
-                            "result": alt_result[:200] if len(str(alt_result)) > 200 else alt_result
-                        }
-                    }
-                )
-
-                validation_results.append(validation)
-
-            except Exception as e:
-                # Validation failed - lower confidence but don't fail
-                validation = ValidationResult(
-                    is_valid=True,  # Assume valid but with lower confidence
-                    confidence=0.7,
-                    issues=[f"Cross-validation failed: {str(e)}"],
-                    cross_check_results={}
-                )
-                validation_results.append(validation)
-
-        # Create summary reasoning step
-        avg_confidence = sum(v.confidence for v in validation_results) / len(validation_results) if validation_results else 1.0
+        # Create summary reasoning step (confidence total and validity in one pass)
+        total_confidence = 0.0
+        all_valid = True
+        for v in validation_results:
+            total_confidence += v.confidence
+            all_valid = all_valid and v.is_valid
+        avg_confidence = total_confidence / len(validation_results) if validation_results else 1.0
         summary_reasoning = create_reasoning_step(
             step_type="validation",
             content=f"Validated {len(validation_results)} calculation(s) with average confidence: {avg_confidence:.2f}",
             metadata={
                 "validated_count": len(validation_results),
                 "average_confidence": avg_confidence,
-                "all_valid": all(v.is_valid for v in validation_results)
+                "all_valid": all_valid
             }
         )
 
         return {
             "validation_results": validation_results,
             "needs_validation": False,
-            "reasoning_steps": [reasoning, summary_reasoning] if 'reasoning' in locals() else [summary_reasoning],
+            "reasoning_steps": reasoning_steps + [summary_reasoning],
             "iteration_count": state["iteration_count"] + 1
         }
 
@@ -2,9 +2,36 @@
 Routing Logic: Determines next node based on agent state
 """
 
+from itertools import product
+
 from agent.agent_state import AgentState
 
 
+def _decide(iteration_exhausted: bool, can_retry: bool, needs_replanning: bool,
+            all_complete: bool, has_hpl_result: bool, hpl_unvalidated: bool,
+            has_work: bool) -> str:
+    """Reference decision tree used to build the routing table"""
+    if iteration_exhausted:
+        return "synthesizer"
+    if can_retry:
+        return "error_handler"
+    if needs_replanning:
+        return "planner"
+    if all_complete:
+        # Only visit the validator when there is an HPL result to cross-check
+        return "validator" if has_hpl_result else "synthesizer"
+    # We validate first, then continue with remaining tasks
+    if hpl_unvalidated:
+        return "validator"
+    if has_work:
+        return "tool_caller"
+    return "synthesizer"
+
+
+# Every combination of the 7 routing bits, resolved once at import time
+_ROUTE_TABLE = {bits: _decide(*bits) for bits in product((False, True), repeat=7)}
+
+
 def route_next_action(state: AgentState) -> str:
     """
     Determines the next node to visit based on current state
@@ -19,50 +46,48 @@ def route_next_action(state: AgentState) -> str:
     """
 
     # Safety check: iteration limit
-    if state["iteration_count"] >= state["max_iterations"]:
-        return "synthesizer"
+    iteration_exhausted = state["iteration_count"] >= state["max_iterations"]
 
     # Error recovery path
-    if state["error_recovery_mode"] and state["retry_count"] < state["max_retries"]:
-        return "error_handler"
+    can_retry = bool(state["error_recovery_mode"]) and state["retry_count"] < state["max_retries"]
+    needs_replanning = bool(state["needs_replanning"])
 
-    # Needs replanning
-    if state["needs_replanning"]:
-        return "planner"
+    # Only the cheap predicates are needed for the first three outcomes
+    if iteration_exhausted or can_retry or needs_replanning:
+        return _ROUTE_TABLE[(iteration_exhausted, can_retry, needs_replanning,
+                             False, False, False, False)]
 
-    # Check if all subtasks are complete
-    all_complete = all(
-        st.status in ["completed", "failed"] for st in state["subtasks"]
-    ) if state["subtasks"] else False
+    # Single pass over subtasks for both completion predicates
+    all_complete = bool(state["subtasks"])
+    has_pending = False
+    for st in state["subtasks"]:
+        if st.status == "pending":
+            has_pending = True
+            all_complete = False
+            break
+        if st.status not in ("completed", "failed"):
+            all_complete = False
 
-    # If all tasks complete
-    if all_complete:
-        # Check if validation is needed
-        if state["needs_validation"]:
-            return "validator"
-        else:
-            return "synthesizer"
-
-    # Validation needed but tasks not complete yet
-    # This happens after tool_caller when a validation-worthy tool was called
-    # We validate first, then continue with remaining tasks
-    if state["needs_validation"] and not all_complete:
-        # Check if there are any HPL calculations that haven't been validated yet
-        hpl_executions = [
-            e for e in state["tool_executions"]
-            if e.tool_name == "calculate_hypothetical_pnl"
-        ]
-
-        # If we have HPL calculations and no validation results yet
-        if hpl_executions and not state["validation_results"]:
-            return "validator"
-
-    # Continue with tool calling if there are pending tasks
-    if state["current_task"] or any(st.status == "pending" for st in state["subtasks"]):
-        return "tool_caller"
+    # Single short-circuiting pass over executions, only when validation matters
+    has_hpl = False
+    has_hpl_result = False
+    if state["needs_validation"]:
+        for e in state["tool_executions"]:
+            if e.tool_name == "calculate_hypothetical_pnl":
+                has_hpl = True
+                if e.result:
+                    has_hpl_result = True
+                    break
 
-    # Default: move to synthesis
-    return "synthesizer"
+    return _ROUTE_TABLE[(
+        False,
+        False,
+        False,
+        all_complete,
+        has_hpl_result,
+        has_hpl and not state["validation_results"],
+        bool(state["current_task"]) or has_pending,
+    )]
 
 
 def should_continue(state: AgentState) -> str:
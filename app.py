@@ -2,34 +2,67 @@
 Flask web application for Finance MCP Chat Agent
 """
 from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import asyncio
-import json
+import atexit
+import logging
+import orjson
 from dotenv import load_dotenv
-from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-from mcp_integration import MCPToolManager
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, SystemMessage
+from mcp_integration import MCPToolManager, prompt_messages_to_langchain
 from agent.agent import FinanceAgent
-import sys
-import io
+from agent.nodes._llm import get_llm
+import os
+import queue
 import threading
+import time
 
-# Set UTF-8 encoding
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+# libuv-based loop for the background thread where available (not on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 load_dotenv()
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses and parses request bodies with orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        # orjson.JSONDecodeError subclasses ValueError, so bad bodies still get a 400
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
+logger = logging.getLogger(__name__)
+
+# Per-event agent-chat tracing; debug level so streams do no console I/O by default
+agent_chat_log = logging.getLogger("agent_chat")
+
 # Global MCP manager and LLM
 mcp_manager = None
 llm = None
+llm_with_tools = None
 tools = None
+finance_agent = None
 async_loop = None
 loop_thread = None
 
+# Guards initialize_mcp; created on the background event loop that uses it
+mcp_init_lock = None
+
+# Serialized /api/prompts and /api/tools bodies, built when MCP metadata is loaded
+prompts_body = None
+tools_body = None
+
 
 def run_event_loop(loop):
     """Run event loop in separate thread"""
@@ -42,33 +75,287 @@ def get_event_loop():
     global async_loop, loop_thread
 
     if async_loop is None or async_loop.is_closed():
-        async_loop = asyncio.new_event_loop()
+        async_loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
         loop_thread = threading.Thread(target=run_event_loop, args=(async_loop,), daemon=True)
         loop_thread.start()
 
     return async_loop
 
 
-def run_async(coro):
-    """Run an async coroutine in the event loop thread"""
+# Most recent messages sent to the model per call; older turns are dropped
+MAX_HISTORY = 50
+
+# Chat conversations keyed by client session_id -> (last_used, messages), in
+# least-recently-used order; only touched from the event loop thread
+CONVERSATION_TTL_SECONDS = 3600
+MAX_CONVERSATIONS = 1024
+conversations = {}
+
+# Deadlines enforced on the loop side so timed-out work is cancelled, not orphaned.
+# Model round-trips get REQUEST_TIMEOUT; MCP-only calls fail fast with DEFAULT_TIMEOUT
+REQUEST_TIMEOUT = 120
+DEFAULT_TIMEOUT = 30
+
+# SSE events buffered between the event loop and the response thread
+STREAM_QUEUE_SIZE = 64
+# Seconds a blocked producer waits for room before checking whether the client left
+STREAM_PUT_POLL = 0.5
+_STREAM_END = object()
+
+
+def run_async(coro, timeout: float = DEFAULT_TIMEOUT):
+    """
+    Run an async coroutine in the event loop thread
+    Raises asyncio.TimeoutError once the coroutine has been cancelled after timeout seconds
+    """
     loop = get_event_loop()
-    future = asyncio.run_coroutine_threadsafe(coro, loop)
-    return future.result(timeout=120)
+    future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(coro, timeout), loop)
+    return future.result()
+
+
+def iter_async(async_gen, label):
+    """
+    Drive an async generator of SSE lines from the event loop thread
+    One pump task feeds a bounded queue, so each event costs a queue hop rather than
+    a cross-thread future, and a slow client back-pressures the producer
+    """
+    loop = get_event_loop()
+    events = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    # Set by the consumer once it stops reading, so a producer waiting for room gives up
+    closed = threading.Event()
+
+    def put_until_closed(item):
+        """Block for room in the queue until the consumer goes away; False if it did"""
+        while not closed.is_set():
+            try:
+                events.put(item, timeout=STREAM_PUT_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def pump():
+        end = _STREAM_END
+        try:
+            async for item in async_gen:
+                try:
+                    events.put_nowait(item)
+                except queue.Full:
+                    # Wait for room off the loop thread; stop producing if the client left
+                    if not await asyncio.to_thread(put_until_closed, item):
+                        return
+        except Exception as e:
+            end = e
+        finally:
+            await async_gen.aclose()
+        await asyncio.to_thread(put_until_closed, end)
+
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+
+    try:
+        while True:
+            item = events.get(timeout=REQUEST_TIMEOUT)
+            if item is _STREAM_END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    except Exception as e:
+        if isinstance(e, queue.Empty):
+            e = TimeoutError(f"No stream event within {REQUEST_TIMEOUT}s")
+        logger.exception("Error in %s stream", label)
+        yield sse_event({'event_type': 'error', 'data': str(e)})
+    finally:
+        # Client gone or stream failed: release a producer blocked on a full queue, then stop it
+        closed.set()
+        future.cancel()
+        while not events.empty():
+            events.get_nowait()
+
+
+def load_conversation(session_id, history):
+    """
+    Messages of a chat so far, as a new list so a failed turn leaves nothing behind
+    Uses the server-side copy for a live session and falls back to the client's history
+    """
+    entry = conversations.get(session_id) if session_id else None
+    if entry is not None and time.monotonic() - entry[0] < CONVERSATION_TTL_SECONDS:
+        return list(entry[1])
+
+    messages = []
+    for msg in history:
+        if msg['role'] == 'user':
+            messages.append(HumanMessage(content=msg['content']))
+        elif msg['role'] == 'assistant':
+            messages.append(AIMessage(content=msg['content']))
+    return messages
+
+
+def save_conversation(session_id, messages):
+    """Store a completed turn, evicting the least recently used conversation when full"""
+    if not session_id:
+        return
+
+    conversations.pop(session_id, None)
+    if len(conversations) >= MAX_CONVERSATIONS:
+        del conversations[next(iter(conversations))]
+    conversations[session_id] = (time.monotonic(), trim_history(messages))
+
+
+def sse_event(payload) -> bytes:
+    """Encode one Server-Sent Event with orjson, yielded to Flask as raw bytes"""
+    return b"data: " + orjson.dumps(payload, default=str) + b"\n\n"
+
+
+def tool_result_text(result) -> str:
+    """ToolMessage content for a tool result; MCP text results pass through without a copy"""
+    if isinstance(result, str):
+        return result
+    return orjson.dumps(result, default=str).decode()
+
+
+def trim_history(messages):
+    """
+    Bound the messages sent to the model to the most recent MAX_HISTORY
+    A leading system message is kept, and the kept window starts on a user turn
+    so tool results are never separated from the call that produced them
+    """
+    if len(messages) <= MAX_HISTORY:
+        return messages
+
+    head = messages[:1] if isinstance(messages[0], SystemMessage) else []
+    tail = messages[len(messages) - (MAX_HISTORY - len(head)):]
+    start = next((i for i, msg in enumerate(tail) if isinstance(msg, HumanMessage)), None)
+    if start is None:
+        # No user turn in the window - trimming here would orphan tool results
+        return messages
+    return head + tail[start:]
+
+
+def extract_text(message):
+    """Extract text from a message whose content is a string or a list of blocks"""
+    content = getattr(message, 'content', '')
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            item['text'] for item in content
+            if isinstance(item, dict) and 'text' in item
+        )
+    return ""
+
+
+def serialize_prompts(prompts) -> bytes:
+    """Build the /api/prompts response body"""
+    prompt_list = []
+    for prompt in prompts:
+        prompt_data = {
+            'name': prompt.name,
+            'description': prompt.description or 'No description',
+            'arguments': []
+        }
+
+        if hasattr(prompt, 'arguments') and prompt.arguments:
+            for arg in prompt.arguments:
+                arg_data = {
+                    'name': arg.name if hasattr(arg, 'name') else str(arg),
+                    'description': arg.description if hasattr(arg, 'description') else '',
+                    'required': arg.required if hasattr(arg, 'required') else True
+                }
+                prompt_data['arguments'].append(arg_data)
+
+        prompt_list.append(prompt_data)
+
+    return orjson.dumps({'prompts': prompt_list})
+
+
+def serialize_tools(tool_objects) -> bytes:
+    """Build the /api/tools response body"""
+    return orjson.dumps({
+        'tools': [{'name': tool.name, 'description': tool.description} for tool in tool_objects]
+    })
+
+
+async def load_mcp_metadata(manager, mcp_server_url):
+    """
+    Load tools and prompts from a connected manager and rebuild everything derived from them
+    Response bodies are serialized here so /api/prompts and /api/tools serve static bytes
+    """
+    global llm, llm_with_tools, tools, finance_agent, prompts_body, tools_body
+
+    new_tools, prompts = await asyncio.gather(
+        manager.get_langchain_tools(),
+        manager.list_prompts(),
+        return_exceptions=True
+    )
+    if isinstance(new_tools, BaseException):
+        raise new_tools
+    # Prompts are optional, as in get_mcp_tools; a server without them serves an empty list
+    if isinstance(prompts, BaseException):
+        logger.warning("Could not list MCP prompts: %s", prompts)
+        prompts = []
+
+    # Same client the agent nodes use, so its connection pool stays warm
+    llm = get_llm()
+    # Tools are fixed until the next load, so bind them once
+    llm_with_tools = llm.bind_tools(new_tools)
+    # One agent for the process, sharing this connection; its graph is built once
+    finance_agent = await FinanceAgent(mcp_server_url, mcp_manager=manager).initialize()
+    tools = new_tools
+    prompts_body = serialize_prompts(prompts)
+    tools_body = serialize_tools(new_tools)
 
 
 async def initialize_mcp():
     """Initialize MCP connection and tools"""
-    global mcp_manager, llm, tools
+    global mcp_manager, mcp_init_lock
+
+    # Fast path once connected; the lock stops concurrent first requests connecting twice
+    if mcp_manager is not None:
+        return
+
+    if mcp_init_lock is None:
+        mcp_init_lock = asyncio.Lock()
+
+    async with mcp_init_lock:
+        if mcp_manager is not None:
+            return
 
-    if mcp_manager is None:
         mcp_server_url = "http://localhost:8000/sse"
-        mcp_manager = MCPToolManager(mcp_server_url)
-        await mcp_manager.connect()
-        tools = await mcp_manager.get_langchain_tools()
-        llm = ChatAnthropic(model="claude-sonnet-4-5", temperature=0)
+        manager = MCPToolManager(mcp_server_url)
+        await manager.connect()
+        try:
+            await load_mcp_metadata(manager, mcp_server_url)
+        except BaseException:
+            # Never published, so nothing else would close this connection
+            await manager.close()
+            raise
+        # Published last so other requests never see a half-initialized manager
+        mcp_manager = manager
         print(f"MCP initialized with {len(tools)} tools")
 
 
+async def refresh_mcp():
+    """Reload tools and prompts on the existing connection"""
+    await initialize_mcp()
+    async with mcp_init_lock:
+        await load_mcp_metadata(mcp_manager, mcp_manager.server_url)
+        print(f"MCP metadata refreshed with {len(tools)} tools")
+
+
+def shutdown_mcp():
+    """Close the shared MCP connection when the process exits"""
+    if mcp_manager is not None and async_loop is not None and async_loop.is_running():
+        try:
+            run_async(mcp_manager.close())
+        except Exception as e:
+            # Ignore cleanup errors (async context scope issues)
+            print(f"MCP shutdown warning (non-critical): {e}")
+
+
+atexit.register(shutdown_mcp)
+
+
 @app.route('/')
 def index():
     """Render the main page"""
@@ -78,38 +365,12 @@ def index():
 @app.route('/api/prompts', methods=['GET'])
 def get_prompts():
     """Get all available MCP prompts"""
-    async def _get_prompts():
-        await initialize_mcp()
-        prompts = await mcp_manager.list_prompts()
-
-        prompt_list = []
-        for prompt in prompts:
-            prompt_data = {
-                'name': prompt.name,
-                'description': prompt.description or 'No description',
-                'arguments': []
-            }
-
-            if hasattr(prompt, 'arguments') and prompt.arguments:
-                for arg in prompt.arguments:
-                    arg_data = {
-                        'name': arg.name if hasattr(arg, 'name') else str(arg),
-                        'description': arg.description if hasattr(arg, 'description') else '',
-                        'required': arg.required if hasattr(arg, 'required') else True
-                    }
-                    prompt_data['arguments'].append(arg_data)
-
-            prompt_list.append(prompt_data)
-
-        return prompt_list
-
     try:
-        result = run_async(_get_prompts())
-        return jsonify({'prompts': result})
+        if prompts_body is None:
+            run_async(initialize_mcp())
+        return app.response_class(prompts_body, mimetype='application/json')
     except Exception as e:
-        print(f"Error in get_prompts: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_prompts")
         return jsonify({'error': str(e)}), 500
 
 
@@ -126,30 +387,10 @@ def execute_prompt():
         # Get the prompt
         prompt_result = await mcp_manager.get_prompt(prompt_name, arguments)
 
-        # Convert MCP messages to LangChain format
-        conversation_messages = []
-        for msg in prompt_result.messages:
-            role = msg.role
-            content = msg.content
-
-            # Extract text
-            if hasattr(content, 'text'):
-                text = content.text
-            elif isinstance(content, list) and len(content) > 0:
-                if hasattr(content[0], 'text'):
-                    text = content[0].text
-                else:
-                    text = str(content[0])
-            else:
-                text = str(content)
-
-            if role == "user":
-                conversation_messages.append(HumanMessage(content=text))
-            elif role == "assistant":
-                conversation_messages.append(AIMessage(content=text))
+        # Convert MCP messages to LangChain format (other roles are skipped)
+        conversation_messages = prompt_messages_to_langchain(prompt_result.messages, default=None)
 
         # Execute workflow with tool calling
-        llm_with_tools = llm.bind_tools(tools)
         results = []
         max_iterations = 10
         iteration = 0
@@ -158,21 +399,11 @@ def execute_prompt():
             iteration += 1
 
             # Invoke LLM
-            response = await llm_with_tools.ainvoke(conversation_messages)
-
-            # Extract response content
-            response_text = ""
-            if hasattr(response, 'content'):
-                if isinstance(response.content, str):
-                    response_text = response.content
-                elif isinstance(response.content, list):
-                    for item in response.content:
-                        if isinstance(item, dict) and 'text' in item:
-                            response_text += item['text'] + "\n"
+            response = await llm_with_tools.ainvoke(trim_history(conversation_messages))
 
             results.append({
                 'type': 'response',
-                'content': response_text,
+                'content': extract_text(response),
                 'round': iteration
             })
 
@@ -183,15 +414,17 @@ def execute_prompt():
             # Add response to conversation
             conversation_messages.append(response)
 
-            # Execute tools
+            # Execute tools concurrently; results come back in call order
             tool_results = []
-            for tool_call in response.tool_calls:
+            call_results = await asyncio.gather(*(
+                mcp_manager.call_tool(tool_call['name'], tool_call['args'])
+                for tool_call in response.tool_calls
+            ))
+            for tool_call, result in zip(response.tool_calls, call_results):
                 tool_name = tool_call['name']
                 tool_args = tool_call['args']
                 tool_id = tool_call['id']
 
-                result = await mcp_manager.call_tool(tool_name, tool_args)
-
                 tool_results.append({
                     'name': tool_name,
                     'args': tool_args,
@@ -200,7 +433,7 @@ def execute_prompt():
 
                 # Add tool message
                 tool_message = ToolMessage(
-                    content=str(result),
+                    content=tool_result_text(result),
                     tool_call_id=tool_id
                 )
                 conversation_messages.append(tool_message)
@@ -214,12 +447,12 @@ def execute_prompt():
         return results
 
     try:
-        result = run_async(_execute_prompt())
+        result = run_async(_execute_prompt(), timeout=REQUEST_TIMEOUT)
         return jsonify({'success': True, 'results': result})
+    except asyncio.TimeoutError:
+        return jsonify({'success': False, 'error': f'Timed out after {REQUEST_TIMEOUT}s'}), 504
     except Exception as e:
-        print(f"Error in execute_prompt: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in execute_prompt")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -229,34 +462,22 @@ def chat():
     data = request.json
     message = data.get('message')
     history = data.get('history', [])
+    session_id = data.get('session_id')
 
     async def _chat():
         await initialize_mcp()
 
-        # Convert history to LangChain messages
-        conversation_messages = []
-        for msg in history:
-            if msg['role'] == 'user':
-                conversation_messages.append(HumanMessage(content=msg['content']))
-            elif msg['role'] == 'assistant':
-                conversation_messages.append(AIMessage(content=msg['content']))
+        # Server-side conversation for a known session, else built from the client's history
+        conversation_messages = load_conversation(session_id, history)
 
         # Add current message
         conversation_messages.append(HumanMessage(content=message))
 
         # Invoke LLM with tools
-        llm_with_tools = llm.bind_tools(tools)
-        response = await llm_with_tools.ainvoke(conversation_messages)
+        response = await llm_with_tools.ainvoke(trim_history(conversation_messages))
 
         # Extract response content
-        response_text = ""
-        if hasattr(response, 'content'):
-            if isinstance(response.content, str):
-                response_text = response.content
-            elif isinstance(response.content, list):
-                for item in response.content:
-                    if isinstance(item, dict) and 'text' in item:
-                        response_text += item['text'] + "\n"
+        response_text = extract_text(response)
 
         tool_calls_made = []
 
@@ -264,13 +485,16 @@ def chat():
         if hasattr(response, 'tool_calls') and response.tool_calls:
             conversation_messages.append(response)
 
-            for tool_call in response.tool_calls:
+            # Tool calls are independent, so run them concurrently
+            call_results = await asyncio.gather(*(
+                mcp_manager.call_tool(tool_call['name'], tool_call['args'])
+                for tool_call in response.tool_calls
+            ))
+            for tool_call, result in zip(response.tool_calls, call_results):
                 tool_name = tool_call['name']
                 tool_args = tool_call['args']
                 tool_id = tool_call['id']
 
-                result = await mcp_manager.call_tool(tool_name, tool_args)
-
                 tool_calls_made.append({
                     'name': tool_name,
                     'args': tool_args,
@@ -279,21 +503,19 @@ def chat():
 
                 # Add tool result to conversation
                 tool_message = ToolMessage(
-                    content=str(result),
+                    content=tool_result_text(result),
                     tool_call_id=tool_id
                 )
                 conversation_messages.append(tool_message)
 
             # Get final response after tool execution
-            final_response = await llm_with_tools.ainvoke(conversation_messages)
+            final_response = await llm_with_tools.ainvoke(trim_history(conversation_messages))
+            response_text = extract_text(final_response)
+            conversation_messages.append(final_response)
+        else:
+            conversation_messages.append(response)
 
-            if hasattr(final_response, 'content'):
-                if isinstance(final_response.content, str):
-                    response_text = final_response.content
-                elif isinstance(final_response.content, list):
-                    for item in final_response.content:
-                        if isinstance(item, dict) and 'text' in item:
-                            response_text = item['text']
+        save_conversation(session_id, conversation_messages)
 
         return {
             'response': response_text,
@@ -301,15 +523,91 @@ def chat():
         }
 
     try:
-        result = run_async(_chat())
+        result = run_async(_chat(), timeout=REQUEST_TIMEOUT)
         return jsonify({'success': True, 'data': result})
+    except asyncio.TimeoutError:
+        return jsonify({'success': False, 'error': f'Timed out after {REQUEST_TIMEOUT}s'}), 504
     except Exception as e:
-        print(f"Error in chat: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in chat")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Stream chat tokens and tool calls with Server-Sent Events"""
+    data = request.json
+    message = data.get('message')
+    history = data.get('history', [])
+    session_id = data.get('session_id')
+
+    if not message:
+        return jsonify({'error': 'No message provided'}), 400
+
+    async def _chat_stream():
+        await initialize_mcp()
+
+        # Server-side conversation for a known session, else built from the client's history
+        conversation_messages = load_conversation(session_id, history)
+
+        # Add current message
+        conversation_messages.append(HumanMessage(content=message))
+
+        # First phase: stream tokens while accumulating any tool calls
+        response = None
+        async for chunk in llm_with_tools.astream(trim_history(conversation_messages)):
+            response = chunk if response is None else response + chunk
+            delta = extract_text(chunk)
+            if delta:
+                yield sse_event({'event_type': 'delta', 'data': delta})
+
+        if response is not None and response.tool_calls:
+            conversation_messages.append(response)
+
+            call_results = await asyncio.gather(*(
+                mcp_manager.call_tool(tool_call['name'], tool_call['args'])
+                for tool_call in response.tool_calls
+            ))
+            for tool_call, result in zip(response.tool_calls, call_results):
+                tool_name = tool_call['name']
+                tool_args = tool_call['args']
+                tool_id = tool_call['id']
+
+                sse_data = {
+                    'event_type': 'tool_call',
+                    'data': {
+                        'name': tool_name,
+                        'args': tool_args,
+                        'result': result
+                    }
+                }
+                yield sse_event(sse_data)
+
+                conversation_messages.append(ToolMessage(
+                    content=tool_result_text(result),
+                    tool_call_id=tool_id
+                ))
+
+            # Second phase: stream the final answer after tool execution
+            final_response = None
+            async for chunk in llm_with_tools.astream(trim_history(conversation_messages)):
+                final_response = chunk if final_response is None else final_response + chunk
+                delta = extract_text(chunk)
+                if delta:
+                    yield sse_event({'event_type': 'delta', 'data': delta})
+            response = final_response
+
+        if response is not None:
+            conversation_messages.append(response)
+            save_conversation(session_id, conversation_messages)
+
+        yield sse_event({'event_type': 'done'})
+
+    return Response(
+        stream_with_context(iter_async(_chat_stream(), "chat")),
+        mimetype='text/event-stream'
+    )
+
+
 @app.route('/api/test', methods=['GET', 'POST'])
 def test_route():
     """Simple test route"""
@@ -328,7 +626,7 @@ def test_agent():
             await agent.initialize()
             return "Agent initialized successfully"
 
-        result = run_async(test_init())
+        result = run_async(test_init(), timeout=REQUEST_TIMEOUT)
         return jsonify({'success': True, 'message': result})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e), 'traceback': traceback.format_exc()}), 500
@@ -337,156 +635,132 @@ def test_agent():
 @app.route('/api/agent-chat', methods=['POST'])
 def agent_chat():
     """Streaming endpoint for LangGraph agent with Server-Sent Events"""
-    print("[AGENT-CHAT] Request received")
+    agent_chat_log.debug("Request received")
     data = request.json
     message = data.get('message')
-    print(f"[AGENT-CHAT] Message: {message}")
+    agent_chat_log.debug("Message: %s", message)
 
     if not message:
         return jsonify({'error': 'No message provided'}), 400
 
     def generate():
-        print("[AGENT-CHAT] Starting generator")
+        agent_chat_log.debug("Starting generator")
         """Generator for SSE streaming"""
         async def stream_agent_response():
-            print("[AGENT-CHAT] Initializing MCP...")
+            agent_chat_log.debug("Initializing MCP...")
             await initialize_mcp()
-            print("[AGENT-CHAT] MCP initialized")
-
-            # Create agent instance
-            mcp_server_url = "http://localhost:8000/sse"
-            print(f"[AGENT-CHAT] Creating agent with MCP URL: {mcp_server_url}")
-            agent = FinanceAgent(mcp_server_url)
-            print("[AGENT-CHAT] Agent created, initializing...")
-            await agent.initialize()
-            print("[AGENT-CHAT] Agent initialized, starting run...")
-
-            try:
-                # Stream execution
-                print(f"[AGENT-CHAT] Running agent with query: {message}")
-                async for event in agent.run(message):
-                    print(f"[AGENT-CHAT] Received event: {list(event.keys())}")
-                    # event is a dict like {"node_name": state_update}
-                    for node_name, state_update in event.items():
-                        # Extract and stream different event types
-
-                        # Reasoning steps
-                        if "reasoning_steps" in state_update and state_update["reasoning_steps"]:
-                            latest_reasoning = state_update["reasoning_steps"][-1]
-                            print(f"[AGENT-CHAT] Sending reasoning step: {latest_reasoning.step_type}")
-                            sse_data = {
-                                "event_type": "reasoning",
-                                "data": {
-                                    "step_type": latest_reasoning.step_type,
-                                    "content": latest_reasoning.content,
-                                    "timestamp": latest_reasoning.timestamp,
-                                    "metadata": latest_reasoning.metadata
-                                },
-                                "state_snapshot": {
-                                    "iteration_count": state_update.get("iteration_count", 0),
-                                    "completed_subtasks": len(state_update.get("completed_subtasks", [])),
-                                    "total_subtasks": len(state_update.get("subtasks", []))
-                                }
+            agent_chat_log.debug("MCP initialized, starting run...")
+
+            # Stream execution on the shared agent; each run gets its own thread
+            agent_chat_log.debug("Running agent with query: %s", message)
+            async for event in finance_agent.run(message):
+                if agent_chat_log.isEnabledFor(logging.DEBUG):
+                    agent_chat_log.debug("Received event: %s", list(event.keys()))
+                # event is a dict like {"node_name": state_update}
+                for node_name, state_update in event.items():
+                    # Read each field once; absent and empty fields are skipped alike
+                    reasoning_steps = state_update.get("reasoning_steps")
+                    subtasks = state_update.get("subtasks")
+                    tool_executions = state_update.get("tool_executions")
+                    final_answer = state_update.get("final_answer")
+
+                    # Reasoning steps
+                    if reasoning_steps:
+                        latest_reasoning = reasoning_steps[-1]
+                        agent_chat_log.debug("Sending reasoning step: %s", latest_reasoning.step_type)
+                        sse_data = {
+                            "event_type": "reasoning",
+                            "data": {
+                                "step_type": latest_reasoning.step_type,
+                                "content": latest_reasoning.content,
+                                "timestamp": latest_reasoning.timestamp,
+                                "metadata": latest_reasoning.metadata
+                            },
+                            "state_snapshot": {
+                                "iteration_count": state_update.get("iteration_count", 0),
+                                "completed_subtasks": len(state_update.get("completed_subtasks") or ()),
+                                "total_subtasks": len(subtasks or ())
                             }
-                            yield f"data: {json.dumps(sse_data)}\n\n"
-
-                        # Subtask updates
-                        if "subtasks" in state_update and state_update["subtasks"]:
-                            for subtask in state_update["subtasks"]:
-                                sse_data = {
-                                    "event_type": "subtask_update",
-                                    "data": {
-                                        "id": subtask.id,
-                                        "description": subtask.description,
-                                        "status": subtask.status,
-                                        "assigned_tools": subtask.assigned_tools,
-                                        "result": subtask.result,
-                                        "error": subtask.error
-                                    }
-                                }
-                                yield f"data: {json.dumps(sse_data)}\n\n"
+                        }
+                        yield sse_event(sse_data)
 
-                        # Tool executions
-                        if "tool_executions" in state_update and state_update["tool_executions"]:
-                            latest_exec = state_update["tool_executions"][-1]
+                    # Subtask updates
+                    if subtasks:
+                        for subtask in subtasks:
                             sse_data = {
-                                "event_type": "tool_execution",
+                                "event_type": "subtask_update",
                                 "data": {
-                                    "tool_name": latest_exec.tool_name,
-                                    "arguments": latest_exec.arguments,
-                                    "result": latest_exec.result,
-                                    "error": latest_exec.error,
-                                    "timestamp": latest_exec.timestamp,
-                                    "subtask_id": latest_exec.subtask_id
+                                    "id": subtask.id,
+                                    "description": subtask.description,
+                                    "status": subtask.status,
+                                    "assigned_tools": subtask.assigned_tools,
+                                    "result": subtask.result,
+                                    "error": subtask.error
                                 }
                             }
-                            yield f"data: {json.dumps(sse_data)}\n\n"
-
-                        # Final answer
-                        if state_update.get("final_answer"):
-                            sse_data = {
-                                "event_type": "final_answer",
-                                "data": state_update["final_answer"]
+                            yield sse_event(sse_data)
+
+                    # Tool executions
+                    if tool_executions:
+                        latest_exec = tool_executions[-1]
+                        sse_data = {
+                            "event_type": "tool_execution",
+                            "data": {
+                                "tool_name": latest_exec.tool_name,
+                                "arguments": latest_exec.arguments,
+                                "result": latest_exec.result,
+                                "error": latest_exec.error,
+                                "timestamp": latest_exec.timestamp,
+                                "subtask_id": latest_exec.subtask_id
                             }
-                            yield f"data: {json.dumps(sse_data)}\n\n"
+                        }
+                        yield sse_event(sse_data)
 
-                # Send completion event
-                yield f"data: {json.dumps({'event_type': 'done'})}\n\n"
+                    # Final answer
+                    if final_answer:
+                        sse_data = {
+                            "event_type": "final_answer",
+                            "data": final_answer
+                        }
+                        yield sse_event(sse_data)
 
-            finally:
-                try:
-                    await agent.close()
-                except Exception as e:
-                    # Ignore cleanup errors (async context scope issues)
-                    print(f"[AGENT-CHAT] Cleanup warning (non-critical): {e}")
+            # Send completion event
+            yield sse_event({'event_type': 'done'})
 
         # Run the async generator in the event loop
-        loop = get_event_loop()
-        async_gen = stream_agent_response()
-
-        try:
-            while True:
-                future = asyncio.run_coroutine_threadsafe(async_gen.__anext__(), loop)
-                yield future.result(timeout=120)
-        except StopAsyncIteration:
-            pass
-        except Exception as e:
-            print(f"Error in agent stream: {e}")
-            import traceback
-            traceback.print_exc()
-            yield f"data: {json.dumps({'event_type': 'error', 'data': str(e)})}\n\n"
+        yield from iter_async(stream_agent_response(), "agent")
 
     try:
         return Response(stream_with_context(generate()), mimetype='text/event-stream')
     except Exception as e:
         import traceback
-        sys.stderr.write(f"\n\n[AGENT-CHAT] Fatal error before streaming started:\n")
-        sys.stderr.write(traceback.format_exc())
-        sys.stderr.flush()
+        agent_chat_log.exception("Fatal error before streaming started")
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
 
 
 @app.route('/api/tools', methods=['GET'])
 def get_tools():
     """Get all available MCP tools"""
-    async def _get_tools():
-        await initialize_mcp()
-        tool_list = []
-        for tool in tools:
-            tool_list.append({
-                'name': tool.name,
-                'description': tool.description
-            })
-        return tool_list
-
     try:
-        result = run_async(_get_tools())
-        return jsonify({'tools': result})
+        if tools_body is None:
+            run_async(initialize_mcp())
+        return app.response_class(tools_body, mimetype='application/json')
     except Exception as e:
-        print(f"Error in get_tools: {e}")
+        logger.exception("Error in get_tools")
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/refresh-mcp', methods=['POST'])
+def refresh_mcp_metadata():
+    """Reload MCP tools and prompts without reconnecting"""
+    try:
+        run_async(refresh_mcp())
+        return jsonify({'success': True, 'tools_count': len(tools)})
+    except Exception as e:
+        logger.exception("Error in refresh_mcp")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/mcp-status', methods=['GET'])
 def mcp_status():
     """Check MCP connection status"""
@@ -508,4 +782,10 @@ def mcp_status():
 if __name__ == '__main__':
     print("Starting Finance MCP Chat Agent Web UI...")
     print("Access the application at: http://localhost:5000")
-    app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False)
+    # Connect before serving; routes still connect lazily if the MCP server is not up yet
+    try:
+        run_async(initialize_mcp())
+    except Exception as e:
+        print(f"MCP not available at startup, will retry on first request: {e}")
+    # Development server; debug only with FLASK_DEV=1. Use gunicorn in production (see README)
+    app.run(debug=os.getenv("FLASK_DEV") == "1", host='0.0.0.0', port=5000, threaded=True, use_reloader=False)
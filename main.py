@@ -5,7 +5,7 @@ from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
-from mcp_integration import get_mcp_tools
+from mcp_integration import get_mcp_tools, prompt_message_text, prompt_messages_to_langchain
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -48,48 +48,38 @@ async def main():
             ("human", "{query}")
         ])
 
-        # Test query - using MCP tools
-        query = "What are all the available hierarchies?"
-        print(f"\n[Query]: {query}\n")
+        # Test queries - using MCP tools (a listing query and an HPL calculation)
+        queries = [
+            "What are all the available hierarchies?",
+            "Calculate the hypothetical P&L for account ACCT-001 using the FHC hierarchy",
+        ]
 
-        # Invoke with tools
+        # The queries are independent, so invoke them concurrently
         chain = prompt | llm_with_tools
-        response = await chain.ainvoke({"query": query})
-
-        print("[Response]:")
-        print(response)
-
-        # If there are tool calls, execute them
-        if hasattr(response, 'tool_calls') and response.tool_calls:
-            print(f"\n[Tool calls made]: {len(response.tool_calls)}")
-            for tool_call in response.tool_calls:
-                print(f"  - {tool_call['name']}({tool_call['args']})")
-                # Execute the tool call through MCP
-                result = await mcp_manager.call_tool(tool_call['name'], tool_call['args'])
-                print(f"    Result: {result}")
-
-        print("\n" + "="*80 + "\n")
-
-        # Another test query - calculate HPL
-        query2 = "Calculate the hypothetical P&L for account ACCT-001 using the FHC hierarchy"
-        print(f"[Query]: {query2}\n")
-
-        response2 = await chain.ainvoke({"query": query2})
-        print("[Response]:")
-        print(response2)
-
-        if hasattr(response2, 'tool_calls') and response2.tool_calls:
-            print(f"\n[Tool calls made]: {len(response2.tool_calls)}")
-            for tool_call in response2.tool_calls:
-                print(f"  - {tool_call['name']}({tool_call['args']})")
-                result = await mcp_manager.call_tool(tool_call['name'], tool_call['args'])
-                print(f"    Result: {result}")
+        responses = await asyncio.gather(*(chain.ainvoke({"query": query}) for query in queries))
+
+        for query, response in zip(queries, responses):
+            print(f"\n[Query]: {query}\n")
+            print("[Response]:")
+            print(response)
+
+            # If there are tool calls, execute them concurrently through MCP
+            if hasattr(response, 'tool_calls') and response.tool_calls:
+                print(f"\n[Tool calls made]: {len(response.tool_calls)}")
+                results = await asyncio.gather(*(
+                    mcp_manager.call_tool(tool_call['name'], tool_call['args'])
+                    for tool_call in response.tool_calls
+                ))
+                for tool_call, result in zip(response.tool_calls, results):
+                    print(f"  - {tool_call['name']}({tool_call['args']})")
+                    print(f"    Result: {result}")
 
-        print("\n" + "="*80 + "\n")
+            print("\n" + "="*80 + "\n")
 
         # Test MCP Prompts
         print("[Listing available MCP prompts]")
-        prompts = await mcp_manager.list_prompts()
+        # Listed by get_mcp_tools alongside the tools when available
+        prompts = mcp_manager.prompts if mcp_manager.prompts is not None else await mcp_manager.list_prompts()
         if prompts:
             print(f"Found {len(prompts)} prompt(s):")
             for prompt in prompts:
@@ -104,11 +94,7 @@ async def main():
         # Test getting the complete workflow prompt
         if prompts and len(prompts) > 0:
             # Look for the finance_complete_analysis prompt
-            complete_prompt = None
-            for prompt in prompts:
-                if prompt.name == "finance_complete_analysis":
-                    complete_prompt = prompt
-                    break
+            complete_prompt = mcp_manager.get_prompt_meta("finance_complete_analysis")
 
             # Fallback to first prompt if complete workflow not found
             if not complete_prompt:
@@ -138,15 +124,7 @@ async def main():
                 role = msg.role
                 content = msg.content
                 # Extract text from content
-                if hasattr(content, 'text'):
-                    text = content.text
-                elif isinstance(content, list) and len(content) > 0:
-                    if hasattr(content[0], 'text'):
-                        text = content[0].text
-                    else:
-                        text = str(content[0])
-                else:
-                    text = str(content)
+                text = prompt_message_text(content)
 
                 print(f"\n  Message {i+1} [{role}]:")
                 print(f"    {text[:200]}..." if len(text) > 200 else f"    {text}")
@@ -157,31 +135,7 @@ async def main():
             print(f"[Using prompt '{prompt_name}' in LangChain conversation]")
 
             # Convert MCP prompt messages to LangChain format
-            from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-
-            conversation_messages = []
-            for msg in prompt_result.messages:
-                role = msg.role
-                content = msg.content
-
-                # Extract text content
-                if hasattr(content, 'text'):
-                    text = content.text
-                elif isinstance(content, list) and len(content) > 0:
-                    if hasattr(content[0], 'text'):
-                        text = content[0].text
-                    else:
-                        text = str(content[0])
-                else:
-                    text = str(content)
-
-                # Convert to appropriate LangChain message type
-                if role == "user":
-                    conversation_messages.append(HumanMessage(content=text))
-                elif role == "assistant":
-                    conversation_messages.append(AIMessage(content=text))
-                else:  # system or other
-                    conversation_messages.append(SystemMessage(content=text))
+            conversation_messages = prompt_messages_to_langchain(prompt_result.messages)
 
             # Invoke LLM with the prompt messages
             response_from_prompt = await llm_with_tools.ainvoke(conversation_messages)
@@ -199,7 +153,7 @@ async def main():
     finally:
         # Clean up MCP connection
         print("\nClosing MCP connection...")
-        await mcp_manager.close()
+        await mcp_manager.release()
 
 
 if __name__ == "__main__":
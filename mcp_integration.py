@@ -4,47 +4,149 @@ Connects to the finance MCP server and converts MCP tools to LangChain tools
 """
 
 import asyncio
-import json
 import logging
-from typing import Any
+import os
+import reprlib
+import threading
+from functools import lru_cache
+import orjson
 from mcp import ClientSession
 from mcp.client.sse import sse_client
-from langchain_core.tools import tool
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.tools import StructuredTool
+from pydantic import create_model, Field
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# MCP_DEBUG=1 turns on the verbose raw-result logging in call_tool
+if os.getenv("MCP_DEBUG") == "1":
+    logger.setLevel(logging.DEBUG)
+
+# Truncating repr for tool payloads in debug logs
+_log_repr = reprlib.Repr()
+_log_repr.maxstring = 200
+_log_repr.maxother = 200
+
+
+# LangChain message class for each MCP prompt message role
+_ROLE_MESSAGE = {"user": HumanMessage, "assistant": AIMessage}
+
+# Background loop for get_tools_sync/call_tool_sync, started on first use
+_sync_loop = None
+
+# Connected managers handed out by get_mcp_tools, keyed by (server_url, event loop) since a
+# session only works on the loop it was opened on. Values are connect tasks, so concurrent
+# callers share a single handshake
+_manager_pool = {}
+
+
+@lru_cache(maxsize=256)
+def _build_args_model(tool_name: str, schema_key: bytes):
+    """
+    Create the Pydantic args model for an MCP tool's input schema
+    Cached per tool name and canonical schema JSON, since create_model is expensive
+
+    Returns:
+        The model class, or None when the schema declares no properties
+    """
+    input_schema = orjson.loads(schema_key)
+    if not input_schema or 'properties' not in input_schema:
+        return None
+
+    # Build fields for the Pydantic model
+    fields = {}
+    properties = input_schema.get('properties', {})
+    required_fields = input_schema.get('required', [])
+
+    for field_name, field_info in properties.items():
+        field_type = str  # Default to str
+        field_desc = field_info.get('description', '')
+
+        # Add to fields dict
+        if field_name in required_fields:
+            fields[field_name] = (field_type, Field(description=field_desc))
+        else:
+            fields[field_name] = (field_type, Field(default=None, description=field_desc))
+
+    # Create dynamic Pydantic model
+    return create_model(f"{tool_name}Args", **fields)
+
 
 class MCPToolManager:
     """Manages connection to MCP server and converts MCP tools to LangChain tools"""
 
-    def __init__(self, server_url: str = "http://localhost:8000/sse"):
+    def __init__(self, server_url: str = "http://localhost:8000/sse", max_concurrent_calls: int = 4):
         self.server_url = server_url
         self.session = None
-        self.tools_list = []
-        self.sse_context = None
-        self.session_context = None
+        self.read = None
+        self.write = None
+        # Task that enters and exits the SSE/session contexts, and its shutdown signal
+        self._owner_task = None
+        self._closing = None
+        # Pooled use: number of get_mcp_tools holders and their shared tool list
+        self.refcount = 0
+        self.langchain_tools = None
+        # First pooled tool listing, shared by concurrent get_mcp_tools callers
+        self._listing = None
+        # Last prompt listing, also indexed by name
+        self.prompts = None
+        self._prompt_index = {}
+        # StructuredTools by (name, description, schema), rebuilt only when a tool changes
+        self._tool_cache = {}
+        # Caps in-flight call_tool requests; the semaphore is created on connect's event loop
+        self.max_concurrent_calls = max_concurrent_calls
+        self._call_semaphore = None
 
     async def connect(self):
-        """Connect to the MCP server via HTTP/SSE"""
-        logger.info(f"Connecting to MCP server at {self.server_url}")
+        """
+        Connect to the MCP server via HTTP/SSE
 
-        # Create SSE client context
-        self.sse_context = sse_client(self.server_url)
-        self.read, self.write = await self.sse_context.__aenter__()
+        The SSE and session contexts are entered and exited by a single owner task
+        (anyio cancel scopes must be exited by the task that entered them), so close()
+        can be called from any task on this event loop
+        """
+        logger.info(f"Connecting to MCP server at {self.server_url}")
+        self._call_semaphore = asyncio.Semaphore(self.max_concurrent_calls)
 
-        # Create session context
-        self.session_context = ClientSession(self.read, self.write)
-        self.session = await self.session_context.__aenter__()
+        ready = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._owner_task = asyncio.ensure_future(self._run_connection(ready))
 
-        # Initialize the connection
-        await self.session.initialize()
+        try:
+            await ready
+        except BaseException:
+            owner_task, self._owner_task = self._owner_task, None
+            owner_task.cancel()
+            # The failure was raised through ready; don't report it again from the task
+            owner_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            raise
 
         logger.info("Successfully connected to MCP server via SSE")
 
         return self
 
+    async def _run_connection(self, ready):
+        """Hold the SSE and session contexts open until close() is called"""
+        try:
+            async with sse_client(self.server_url) as (read, write):
+                self.read, self.write = read, write
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    ready.set_result(None)
+                    await self._closing.wait()
+        except BaseException as e:
+            if not ready.done():
+                if isinstance(e, asyncio.CancelledError):
+                    ready.cancel()
+                else:
+                    ready.set_exception(e)
+            raise
+        finally:
+            self.session = None
+
     async def list_tools(self):
         """List all available tools from the MCP server"""
         if not self.session:
@@ -59,42 +161,40 @@ class MCPToolManager:
             raise RuntimeError("Not connected to MCP server. Call connect() first.")
 
         # Log the tool call
-        logger.info(f"[MCP TOOL CALL] Tool: {tool_name}, Arguments: {arguments}")
+        logger.info("[MCP TOOL CALL] Tool: %s, Arguments: %s", tool_name, arguments)
 
-        result = await self.session.call_tool(tool_name, arguments)
+        async with self._call_semaphore:
+            result = await self.session.call_tool(tool_name, arguments)
+        content = getattr(result, 'content', None)
 
-        # Log the raw result for debugging
-        logger.info(f"[MCP RAW RESULT] Tool: {tool_name}, Raw result: {result}")
-        logger.info(f"[MCP RAW RESULT] Result type: {type(result)}")
-        if hasattr(result, 'content'):
-            logger.info(f"[MCP RAW RESULT] Content length: {len(result.content)}")
-            for i, content_item in enumerate(result.content):
-                logger.info(f"[MCP RAW RESULT] Content[{i}]: type={type(content_item)}, value={content_item}")
+        # Raw results can be large, so only describe them when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[MCP RAW RESULT] Tool: %s, type=%s, len=%s",
+                tool_name, type(result).__name__, len(content) if content is not None else None
+            )
+            for i, content_item in enumerate(content or ()):
+                logger.debug("[MCP RAW RESULT] Content[%d]: %s", i, _log_repr.repr(content_item))
 
         # Extract content from result
         extracted_result = None
-        if hasattr(result, 'content') and len(result.content) > 0:
+        if content:
             # Extract all content items, not just the first one
-            if len(result.content) == 1:
+            if len(content) == 1:
                 # Single content item - return as string
-                content_item = result.content[0]
-                if hasattr(content_item, 'text'):
-                    extracted_result = content_item.text
+                extracted_result = getattr(content[0], 'text', None)
             else:
-                # Multiple content items - combine them
-                text_items = []
-                for content_item in result.content:
-                    if hasattr(content_item, 'text'):
-                        text_items.append(content_item.text)
-                # Join with newlines or commas depending on content
-                if text_items:
-                    extracted_result = '\n'.join(text_items)
+                # Multiple content items - join their text with newlines
+                texts = [text for text in (getattr(item, 'text', None) for item in content) if text is not None]
+                if texts:
+                    extracted_result = '\n'.join(texts)
 
         if extracted_result is None:
             extracted_result = str(result)
 
         # Log the extracted result
-        logger.info(f"[MCP TOOL RESULT] Tool: {tool_name}, Extracted Result: {extracted_result}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[MCP TOOL RESULT] Tool: %s, Extracted Result: %s", tool_name, _log_repr.repr(extracted_result))
 
         return extracted_result
 
@@ -104,8 +204,14 @@ class MCPToolManager:
             raise RuntimeError("Not connected to MCP server. Call connect() first.")
 
         result = await self.session.list_prompts()
+        self.prompts = result.prompts
+        self._prompt_index = {prompt.name: prompt for prompt in result.prompts}
         return result.prompts
 
+    def get_prompt_meta(self, name: str):
+        """Look up a prompt's metadata by name from the last listing, or None"""
+        return self._prompt_index.get(name)
+
     async def get_prompt(self, name: str, arguments: dict = None):
         """Get a specific prompt from the MCP server
 
@@ -135,84 +241,163 @@ class MCPToolManager:
         return langchain_tools
 
     def _create_langchain_tool(self, mcp_tool):
-        """Create a LangChain tool from an MCP tool"""
-        from langchain_core.tools import StructuredTool
-        from pydantic import BaseModel, create_model, Field
-        from typing import Any, Dict
-
+        """Create a LangChain tool from an MCP tool (reused while its schema is unchanged)"""
         tool_name = mcp_tool.name
         tool_description = mcp_tool.description or f"MCP tool: {tool_name}"
 
         # Get input schema from MCP tool
         input_schema = mcp_tool.inputSchema if hasattr(mcp_tool, 'inputSchema') else {}
 
-        # Create Pydantic model from input schema if available
-        if input_schema and 'properties' in input_schema:
-            # Build fields for the Pydantic model
-            fields = {}
-            properties = input_schema.get('properties', {})
-            required_fields = input_schema.get('required', [])
+        # Canonical schema text identifies the tool version across list_tools calls
+        schema_key = orjson.dumps(input_schema or {}, option=orjson.OPT_SORT_KEYS)
+        cache_key = (tool_name, tool_description, schema_key)
+        cached = self._tool_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-            for field_name, field_info in properties.items():
-                field_type = str  # Default to str
-                field_desc = field_info.get('description', '')
-
-                # Add to fields dict
-                if field_name in required_fields:
-                    fields[field_name] = (field_type, Field(description=field_desc))
-                else:
-                    fields[field_name] = (field_type, Field(default=None, description=field_desc))
-
-            # Create dynamic Pydantic model
-            ArgsModel = create_model(f"{tool_name}Args", **fields)
-        else:
-            # No schema - use generic dict
-            ArgsModel = None
+        # Pydantic model from input schema if available, else no schema (generic dict)
+        ArgsModel = _build_args_model(tool_name, schema_key)
 
         # Create async function for this specific tool
         async def tool_func(**kwargs) -> str:
             """Dynamically created tool that calls the MCP server"""
-            result = await self.call_tool(tool_name, kwargs)
-            return str(result)
-
-        # Create structured tool
-        if ArgsModel:
-            return StructuredTool.from_function(
-                coroutine=tool_func,
-                name=tool_name,
-                description=tool_description,
-                args_schema=ArgsModel
-            )
-        else:
-            return StructuredTool.from_function(
-                coroutine=tool_func,
-                name=tool_name,
-                description=tool_description,
-            )
+            # call_tool always returns text, so no str() copy is needed
+            return await self.call_tool(tool_name, kwargs)
+
+        # Create structured tool (args_schema=None lets from_function infer a generic one)
+        langchain_tool = StructuredTool.from_function(
+            coroutine=tool_func,
+            name=tool_name,
+            description=tool_description,
+            args_schema=ArgsModel
+        )
+
+        self._tool_cache[cache_key] = langchain_tool
+        return langchain_tool
+
+    async def release(self):
+        """Drop one get_mcp_tools reference, closing the connection when none remain"""
+        self.refcount -= 1
+        if self.refcount <= 0:
+            await self.close()
 
     async def close(self):
         """Close the MCP connection"""
-        if self.session_context:
-            await self.session_context.__aexit__(None, None, None)
-        if self.sse_context:
-            await self.sse_context.__aexit__(None, None, None)
+        # A closed manager must not be handed out by the pool again
+        for key, task in list(_manager_pool.items()):
+            if task.done() and not task.cancelled() and task.exception() is None and task.result() is self:
+                del _manager_pool[key]
+        owner_task, self._owner_task = self._owner_task, None
+        if owner_task is not None:
+            self._closing.set()
+            try:
+                await owner_task
+            except Exception:
+                logger.exception("Error while closing MCP connection to %s", self.server_url)
+
+
+def prompt_message_text(content) -> str:
+    """
+    Extract the text of an MCP prompt message's content
+
+    Args:
+        content: A content object with .text, a list of content items, or anything else
+
+    Returns:
+        The text of the content (or of its first item), falling back to str()
+    """
+    text = getattr(content, 'text', None)
+    if text is not None:
+        return text
+    if isinstance(content, list) and content:
+        first = content[0]
+        text = getattr(first, 'text', None)
+        return text if text is not None else str(first)
+    return str(content)
+
+
+def prompt_messages_to_langchain(messages, default=SystemMessage) -> list:
+    """
+    Convert MCP prompt messages to LangChain messages
+
+    Args:
+        messages: Messages from a get_prompt result
+        default: Message class for roles other than user/assistant, or None to drop them
+
+    Returns:
+        List of LangChain messages
+    """
+    converted = []
+    for msg in messages:
+        message_cls = _ROLE_MESSAGE.get(msg.role, default)
+        if message_cls is not None:
+            converted.append(message_cls(content=prompt_message_text(msg.content)))
+    return converted
+
+
+async def _list_tools_and_prompts(manager: MCPToolManager):
+    """List tools, with prompts in the same round trip window (prompts are optional)"""
+    tools, prompts = await asyncio.gather(
+        manager.get_langchain_tools(),
+        manager.list_prompts(),
+        return_exceptions=True
+    )
+    if isinstance(tools, BaseException):
+        raise tools
+    # A successful listing has already stored and indexed itself on the manager
+    manager.langchain_tools = tools
+    return tools
 
 
 async def get_mcp_tools(server_url: str = "http://localhost:8000/sse"):
     """
     Connect to MCP server and return LangChain-compatible tools
 
+    Connections are pooled per server URL and event loop, so repeated calls reuse the
+    session and tool list; call manager.release() when done instead of close().
+    Prompts are listed alongside the tools and kept on manager.prompts
+
     Args:
         server_url: URL of the MCP server (HTTP/SSE endpoint)
 
     Returns:
         List of LangChain tools
     """
-    manager = MCPToolManager(server_url)
-    await manager.connect()
-
-    # Get tools
-    tools = await manager.get_langchain_tools()
+    loop = asyncio.get_running_loop()
+
+    # Forget managers whose event loop has been closed (e.g. by asyncio.run)
+    for stale_key in [key for key in _manager_pool if key[1].is_closed()]:
+        del _manager_pool[stale_key]
+
+    key = (server_url, loop)
+    task = _manager_pool.get(key)
+    if task is None:
+        task = asyncio.ensure_future(MCPToolManager(server_url).connect())
+        _manager_pool[key] = task
+
+    try:
+        manager = await task
+    except Exception:
+        if _manager_pool.get(key) is task:
+            del _manager_pool[key]
+        raise
+
+    # Held before the listing so a concurrent release can't close the connection under it
+    manager.refcount += 1
+
+    # The first caller lists; concurrent first callers await the same listing
+    if manager._listing is None:
+        manager._listing = asyncio.ensure_future(_list_tools_and_prompts(manager))
+    listing = manager._listing
+    try:
+        tools = await asyncio.shield(listing)
+    except BaseException:
+        # A failed listing is retried by the next caller, and this caller's reference dropped
+        if listing.done() and (listing.cancelled() or listing.exception() is not None):
+            if manager._listing is listing:
+                manager._listing = None
+        await manager.release()
+        raise
 
     # Print available tools
     print(f"Connected to MCP server. Available tools: {[t.name for t in tools]}")
@@ -220,14 +405,45 @@ async def get_mcp_tools(server_url: str = "http://localhost:8000/sse"):
     return tools, manager
 
 
+def _get_sync_loop():
+    """Get or start the background event loop that owns sessions opened by the sync helpers"""
+    global _sync_loop
+
+    if _sync_loop is None or _sync_loop.is_closed():
+        _sync_loop = asyncio.new_event_loop()
+        threading.Thread(target=_sync_loop.run_forever, daemon=True).start()
+
+    return _sync_loop
+
+
 def get_tools_sync(server_url: str = "http://localhost:8000/sse"):
     """
     Synchronous wrapper to get MCP tools
 
+    Runs on a long-lived background loop, so the pooled session stays usable after the
+    call returns and later get_tools_sync calls reuse it instead of reconnecting
+
     Args:
         server_url: URL of the MCP server (HTTP/SSE endpoint)
 
     Returns:
         Tuple of (tools list, manager instance)
     """
-    return asyncio.run(get_mcp_tools(server_url))
+    future = asyncio.run_coroutine_threadsafe(get_mcp_tools(server_url), _get_sync_loop())
+    return future.result()
+
+
+def call_tool_sync(manager: MCPToolManager, tool_name: str, arguments: dict):
+    """
+    Synchronously call a tool on a manager obtained from get_tools_sync
+
+    Args:
+        manager: Manager returned by get_tools_sync
+        tool_name: Name of the tool to call
+        arguments: Tool arguments
+
+    Returns:
+        The extracted tool result
+    """
+    future = asyncio.run_coroutine_threadsafe(manager.call_tool(tool_name, arguments), _get_sync_loop())
+    return future.result()
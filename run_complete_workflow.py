@@ -3,19 +3,129 @@ Execute the complete finance analysis workflow from MCP prompts
 """
 import asyncio
 import sys
+import orjson
 from dotenv import load_dotenv
 from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
-from mcp_integration import get_mcp_tools
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from mcp_integration import get_mcp_tools, prompt_messages_to_langchain
+from agent.nodes._llm import chunk_text
 
 load_dotenv()
 
+# Tool rounds whose results are resent in full; older results are elided
+KEEP_FULL_ROUNDS = 2
+
+# Identical consecutive tool rounds after which the workflow is treated as stuck
+MAX_REPEATED_ROUNDS = 3
+
 # Set stdout encoding to UTF-8 to handle Unicode characters
 if sys.stdout.encoding != 'utf-8':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
 
+def compact_messages(messages, workflow_len: int, keep_rounds: int = KEEP_FULL_ROUNDS):
+    """
+    Elide tool results older than the last keep_rounds tool rounds, so each turn
+    does not resend every earlier result
+
+    Args:
+        messages: Conversation so far, starting with the workflow steps
+        workflow_len: Number of leading workflow messages, always kept verbatim
+        keep_rounds: Number of latest assistant/tool rounds kept in full
+
+    Returns:
+        New message list
+    """
+    round_starts = [
+        i for i in range(workflow_len, len(messages))
+        if isinstance(messages[i], AIMessage) and messages[i].tool_calls
+    ]
+    if len(round_starts) <= keep_rounds:
+        return messages
+
+    cutoff = round_starts[-keep_rounds] if keep_rounds else len(messages)
+    tool_names = {}
+    compacted = messages[:workflow_len]
+    for msg in messages[workflow_len:cutoff]:
+        if isinstance(msg, AIMessage):
+            tool_names.update((call['id'], call['name']) for call in msg.tool_calls)
+        elif isinstance(msg, ToolMessage) and not msg.content.startswith("[elided]"):
+            name = tool_names.get(msg.tool_call_id, "tool")
+            msg = ToolMessage(
+                content=f"[elided] {name}: {len(msg.content)} character result",
+                tool_call_id=msg.tool_call_id
+            )
+        compacted.append(msg)
+    compacted.extend(messages[cutoff:])
+    return compacted
+
+
+def round_signature(tool_calls) -> tuple:
+    """Hashable identity of a round's tool calls, for detecting repeated rounds"""
+    return tuple(
+        (call['name'], orjson.dumps(call['args'], option=orjson.OPT_SORT_KEYS))
+        for call in tool_calls
+    )
+
+
+async def stream_turn(llm_with_tools, messages, mcp_manager):
+    """
+    Stream one LLM turn, printing text as it arrives and starting each tool call
+    as soon as the model moves past it (its arguments are then complete)
+
+    Returns:
+        Tuple of (merged response chunk or None, dict of tool call id -> call_tool task)
+    """
+    response = None
+    tool_tasks = {}
+    printed_text = False
+
+    def start_tool_calls(before_index=None):
+        # Tool call chunks are streamed one call at a time, so every call with a lower
+        # index than the one currently streaming has its full arguments
+        for call_chunk in response.tool_call_chunks:
+            call_id = call_chunk.get('id')
+            index = call_chunk.get('index')
+            if call_id is None or call_id in tool_tasks:
+                continue
+            if before_index is not None and (index is None or index >= before_index):
+                continue
+            try:
+                args = orjson.loads(call_chunk.get('args') or '{}')
+            except orjson.JSONDecodeError:
+                # Left to the merged tool_calls, which report it as invalid
+                continue
+            tool_tasks[call_id] = asyncio.ensure_future(mcp_manager.call_tool(call_chunk['name'], args))
+
+    try:
+        async for chunk in llm_with_tools.astream(messages):
+            response = chunk if response is None else response + chunk
+
+            text = chunk_text(chunk.content)
+            if text:
+                if not printed_text:
+                    print("\n[LLM Response]: ", end="")
+                    printed_text = True
+                print(text, end="", flush=True)
+
+            indexes = [c.get('index') for c in chunk.tool_call_chunks if c.get('index') is not None]
+            if indexes:
+                start_tool_calls(before_index=min(indexes))
+
+        if response is not None:
+            start_tool_calls()
+    except BaseException:
+        for task in tool_tasks.values():
+            task.cancel()
+        raise
+
+    if printed_text:
+        print()
+
+    return response, tool_tasks
+
+
 async def run_complete_workflow():
     """Execute the complete finance analysis workflow using MCP prompts"""
 
@@ -38,12 +148,10 @@ async def run_complete_workflow():
         print("LOADING COMPLETE WORKFLOW PROMPT")
         print("=" * 80)
 
-        prompts = await mcp_manager.list_prompts()
-        complete_prompt = None
-        for prompt in prompts:
-            if prompt.name == "finance_complete_analysis":
-                complete_prompt = prompt
-                break
+        # Listed by get_mcp_tools alongside the tools when available
+        if mcp_manager.prompts is None:
+            await mcp_manager.list_prompts()
+        complete_prompt = mcp_manager.get_prompt_meta("finance_complete_analysis")
 
         if not complete_prompt:
             print("Error: finance_complete_analysis prompt not found!")
@@ -58,29 +166,7 @@ async def run_complete_workflow():
         print(f"[OK] Loaded workflow with {len(prompt_result.messages)} steps")
 
         # Convert MCP prompt messages to LangChain format
-        conversation_messages = []
-        for msg in prompt_result.messages:
-            role = msg.role
-            content = msg.content
-
-            # Extract text content
-            if hasattr(content, 'text'):
-                text = content.text
-            elif isinstance(content, list) and len(content) > 0:
-                if hasattr(content[0], 'text'):
-                    text = content[0].text
-                else:
-                    text = str(content[0])
-            else:
-                text = str(content)
-
-            # Convert to LangChain message
-            if role == "user":
-                conversation_messages.append(HumanMessage(content=text))
-            elif role == "assistant":
-                conversation_messages.append(AIMessage(content=text))
-            else:
-                conversation_messages.append(SystemMessage(content=text))
+        conversation_messages = prompt_messages_to_langchain(prompt_result.messages)
 
         print("\n" + "=" * 80)
         print("WORKFLOW STEPS")
@@ -95,54 +181,73 @@ async def run_complete_workflow():
 
         max_iterations = 10
         iteration = 0
+        workflow_len = len(conversation_messages)
+        last_signature = None
+        repeated_rounds = 0
 
         while iteration < max_iterations:
             iteration += 1
             print(f"\n--- Round {iteration} ---")
 
-            # Invoke LLM with current conversation
-            response = await llm_with_tools.ainvoke(conversation_messages)
-
-            # Check if there's text content to display
-            if hasattr(response, 'content'):
-                if isinstance(response.content, str):
-                    print(f"\n[LLM Response]: {response.content}")
-                elif isinstance(response.content, list):
-                    for item in response.content:
-                        if isinstance(item, dict) and 'text' in item:
-                            print(f"\n[LLM Response]: {item['text']}")
+            # Stream the LLM turn; tool calls start while the rest of the turn is generated
+            response, tool_tasks = await stream_turn(llm_with_tools, conversation_messages, mcp_manager)
 
             # Check for tool calls
-            if not hasattr(response, 'tool_calls') or not response.tool_calls:
+            if response is None or not response.tool_calls:
                 # No more tool calls - workflow complete
                 print("\n[OK] Workflow completed - no more tool calls needed")
                 break
 
+            # Stop if the model keeps issuing the same tool calls
+            signature = round_signature(response.tool_calls)
+            repeated_rounds = repeated_rounds + 1 if signature == last_signature else 1
+            last_signature = signature
+            if repeated_rounds >= MAX_REPEATED_ROUNDS:
+                print(f"\n[WARNING] Same tool calls repeated {repeated_rounds} times in a row - stopping")
+                for task in tool_tasks.values():
+                    task.cancel()
+                break
+
             # Execute tool calls
             print(f"\n[Executing {len(response.tool_calls)} tool call(s)]:")
 
             # Add the assistant's response to conversation
             conversation_messages.append(response)
 
-            # Execute each tool and add results to conversation
-            for tool_call in response.tool_calls:
+            # Wait for the tool calls started during the stream (any others start now);
+            # results keep the tool_calls order
+            results = await asyncio.gather(
+                *(
+                    tool_tasks.get(tool_call['id']) or mcp_manager.call_tool(tool_call['name'], tool_call['args'])
+                    for tool_call in response.tool_calls
+                ),
+                return_exceptions=True
+            )
+
+            # Add results to conversation
+            for tool_call, result in zip(response.tool_calls, results):
                 tool_name = tool_call['name']
                 tool_args = tool_call['args']
                 tool_id = tool_call['id']
 
                 print(f"  > {tool_name}({tool_args})")
 
-                # Call the tool through MCP
-                result = await mcp_manager.call_tool(tool_name, tool_args)
-                print(f"    Result: {result[:200]}..." if len(str(result)) > 200 else f"    Result: {result}")
+                # A failed call is reported back to the model instead of aborting the workflow;
+                # call_tool returns text, so result is a str either way
+                if isinstance(result, Exception):
+                    result = f"Error: {result}"
+                print(f"    Result: {result[:200]}..." if len(result) > 200 else f"    Result: {result}")
 
                 # Add tool result to conversation
                 tool_message = ToolMessage(
-                    content=str(result),
+                    content=result,
                     tool_call_id=tool_id
                 )
                 conversation_messages.append(tool_message)
 
+            # Keep the resent conversation from growing with every old tool result
+            conversation_messages = compact_messages(conversation_messages, workflow_len)
+
         if iteration >= max_iterations:
             print(f"\n[WARNING] Reached maximum iterations ({max_iterations})")
 
@@ -171,7 +276,7 @@ async def run_complete_workflow():
         print("\n" + "=" * 80)
         print("CLOSING MCP CONNECTION")
         print("=" * 80)
-        await mcp_manager.close()
+        await mcp_manager.release()
 
 
 if __name__ == "__main__":
@@ -10,8 +10,13 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app import app as flask_app
 from mcp_integration import MCPToolManager
+from tests.fixtures.session_loop import SESSION_LOOP, run_on_session_loop, stop_session_loop
+
+# MCP server the tests connect to; FINANCE_MCP_PATH overrides the default
+MCP_SERVER_PATH = os.environ.get("FINANCE_MCP_PATH", r"C:\Users\pinak\code\finance-mcp-server\main.py")
+
+from app import app as flask_app
 from langchain_anthropic import ChatAnthropic
 
 
@@ -24,11 +29,16 @@ def pytest_bdd_step_error(request, feature, scenario, step, step_func, step_func
 
 # Event loop fixture
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create event loop for async tests"""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def mcp_loop():
+    """Event loop running on a background thread; the session's MCP connection lives on it"""
+    yield SESSION_LOOP
+    stop_session_loop()
+
+
+@pytest.fixture(scope="session")
+def run_async(mcp_loop):
+    """Helper to run async functions in tests on the session loop"""
+    return run_on_session_loop
 
 
 # Context fixtures for storing test data
@@ -57,7 +67,7 @@ def prompt_context():
 
 
 # Flask app fixture
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_app():
     """Create Flask test application"""
     flask_app.config['TESTING'] = True
@@ -65,58 +75,63 @@ def test_app():
     return flask_app
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_client(test_app):
-    """Create Flask test client"""
+    """Create Flask test client (shared by the session; per-scenario state lives in api_context)"""
     with test_app.test_client() as client:
         yield client
 
 
 # MCP Manager fixture
 @pytest.fixture(scope="session")
-def mcp_manager(event_loop):
-    """Create and initialize MCP manager"""
-    async def _create_manager():
-        server_path = r"C:\Users\pinak\code\finance-mcp-server\main.py"
-        manager = MCPToolManager(server_path)
-        try:
-            await manager.connect()
-            return manager
-        except Exception as e:
-            pytest.skip(f"Could not connect to MCP server: {e}")
-            return None
-
-    manager = event_loop.run_until_complete(_create_manager())
+def live_mcp_manager(run_async):
+    """MCP manager connected on first use, so runs without @needs_mcp scenarios never connect"""
+    manager = MCPToolManager(MCP_SERVER_PATH)
+    try:
+        run_async(manager.connect())
+    except Exception as e:
+        pytest.skip(f"Could not connect to MCP server: {e}")
 
     yield manager
 
     # Cleanup
-    if manager:
-        try:
-            event_loop.run_until_complete(manager.close())
-        except:
-            pass
+    try:
+        run_async(manager.close())
+    except:
+        pass
 
 
 @pytest.fixture
-def mcp_tools(mcp_manager, event_loop):
-    """Get MCP tools"""
-    async def _get_tools():
-        return await mcp_manager.get_langchain_tools()
+def mcp_manager(request):
+    """Live MCP manager for scenarios tagged @needs_mcp, otherwise the mock manager"""
+    if request.node.get_closest_marker("needs_mcp"):
+        return request.getfixturevalue("live_mcp_manager")
+    return request.getfixturevalue("mock_mcp_manager")
 
-    tools = event_loop.run_until_complete(_get_tools())
-    return tools
 
+@pytest.fixture(scope="session")
+def mcp_tool_list(live_mcp_manager, run_async):
+    """Raw MCP tool listing, fetched once per session since the server's tool set is fixed"""
+    return run_async(live_mcp_manager.list_tools())
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
+def mcp_tools(live_mcp_manager, run_async):
+    """Get MCP tools (listed once per session and kept on the manager)"""
+    if live_mcp_manager.langchain_tools is None:
+        live_mcp_manager.langchain_tools = run_async(live_mcp_manager.get_langchain_tools())
+    return live_mcp_manager.langchain_tools
+
+
+@pytest.fixture(scope="session")
 def llm():
     """Create LLM instance"""
     return ChatAnthropic(model="claude-sonnet-4-5", temperature=0)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def llm_with_tools(llm, mcp_tools):
-    """Create LLM with tools bound"""
+    """Create LLM with tools bound (once per session; tool schemas are converted on bind)"""
     return llm.bind_tools(mcp_tools)
 
 
@@ -198,12 +213,6 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "unit: mark test as unit test"
     )
-
-
-# Helpers
-@pytest.fixture
-def run_async(event_loop):
-    """Helper to run async functions in tests"""
-    def _run(coro):
-        return event_loop.run_until_complete(coro)
-    return _run
+    config.addinivalue_line(
+        "markers", "needs_mcp: scenario needs a live MCP server connection"
+    )
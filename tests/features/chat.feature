@@ -1,3 +1,4 @@
+@needs_mcp
 Feature: Chat Interface
   As a user
   I want to chat with the AI assistant
@@ -1,3 +1,4 @@
+@needs_mcp
 Feature: MCP Server Integration
   As a developer
   I want to connect to the MCP server
@@ -8,11 +9,13 @@ Feature: MCP Server Integration
     And the application is initialized
 
   Scenario: Successfully connect to MCP server
-    When I initialize the MCP connection
+    When I open a new MCP connection
     Then the connection should be established
     And I should see available tools loaded
     And the tools list should contain "get_hpl_formula"
     And the tools list should contain "calculate_hypothetical_pnl"
+    When I close the MCP connection
+    Then the connection should be closed
 
   Scenario: List available MCP tools
     Given the MCP connection is established
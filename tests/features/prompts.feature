@@ -1,3 +1,4 @@
+@needs_mcp
 Feature: MCP Prompts Management
   As a user
   I want to use predefined MCP prompts
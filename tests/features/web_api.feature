@@ -13,6 +13,7 @@ Feature: Web API Endpoints
     And the response should contain HTML
     And the page should contain "Finance MCP Chat Agent"
 
+  @needs_mcp
   Scenario: Get list of prompts via API
     When I make a GET request to "/api/prompts"
     Then the response status should be 200
@@ -21,6 +22,7 @@ Feature: Web API Endpoints
     And the prompts array should have 6 items
     And each prompt should have "name" and "description"
 
+  @needs_mcp
   Scenario: Get list of tools via API
     When I make a GET request to "/api/tools"
     Then the response status should be 200
@@ -28,6 +30,7 @@ Feature: Web API Endpoints
     And the JSON should have a "tools" array
     And the tools array should have 5 items
 
+  @needs_mcp
   Scenario: Execute prompt via API
     Given I have a JSON payload with:
       | field         | value                      |
@@ -40,6 +43,7 @@ Feature: Web API Endpoints
     And the results should contain multiple rounds
     And the results should contain tool calls
 
+  @needs_mcp
   Scenario: Execute prompt without required parameters
     Given I have a JSON payload with:
       | field         | value                      |
@@ -50,6 +54,7 @@ Feature: Web API Endpoints
     And the JSON should have "success" set to false
     And the JSON should have an "error" field
 
+  @needs_mcp
   Scenario: Send chat message via API
     Given I have a JSON payload with:
       | field     | value                              |
@@ -63,6 +68,7 @@ Feature: Web API Endpoints
     And the data should have a "tool_calls" array
     And the tool_calls should contain "get_all_hierarchies"
 
+  @needs_mcp
   Scenario: Send chat with conversation history
     Given I have a JSON payload with:
       | field     | value                                                              |
@@ -73,6 +79,17 @@ Feature: Web API Endpoints
     And the JSON should have "success" set to true
     And the tool_calls should contain "get_hpl_formula"
 
+  @needs_mcp
+  Scenario: Stream chat message via API
+    Given I have a JSON payload with:
+      | field     | value                              |
+      | message   | What hierarchies are available?    |
+      | history   | []                                 |
+    When I make a POST request to "/api/chat/stream" with the payload
+    Then the response status should be 200
+    And the page should contain "delta"
+    And the page should contain "done"
+
   Scenario: Handle invalid endpoint
     When I make a GET request to "/api/invalid_endpoint"
     Then the response status should be 404
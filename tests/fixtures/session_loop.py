@@ -0,0 +1,37 @@
+"""
+Session event loop shared by the MCP fixtures and step definitions
+"""
+import asyncio
+import functools
+import threading
+
+# libuv-based loop where available (not on Windows), as in app.py
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Runs on a daemon thread for the whole test session; the MCP session lives on it
+SESSION_LOOP = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+_loop_thread = threading.Thread(target=SESSION_LOOP.run_forever, daemon=True)
+_loop_thread.start()
+
+
+def run_on_session_loop(coro):
+    """Run a coroutine on the session loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, SESSION_LOOP).result()
+
+
+def async_to_sync(fn):
+    """Wrap an async step function so pytest-bdd can call it synchronously on the session loop"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return run_on_session_loop(fn(*args, **kwargs))
+    return wrapper
+
+
+def stop_session_loop():
+    """Stop and close the session loop at the end of the test run"""
+    SESSION_LOOP.call_soon_threadsafe(SESSION_LOOP.stop)
+    _loop_thread.join()
+    SESSION_LOOP.close()
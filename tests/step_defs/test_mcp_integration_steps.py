@@ -4,7 +4,7 @@ Step definitions for MCP Integration feature tests
 import pytest
 from pytest_bdd import scenarios, given, when, then, parsers
 from mcp_integration import MCPToolManager
-import asyncio
+from tests.fixtures.session_loop import async_to_sync, run_on_session_loop
 
 # Load scenarios from feature file
 scenarios('../features/mcp_integration.feature')
@@ -25,21 +25,16 @@ def app_initialized(test_app):
     return test_app
 
 
-@when('I initialize the MCP connection')
-def initialize_mcp(mcp_context):
-    """Initialize MCP connection"""
-    async def _init():
-        server_path = r"C:\Users\pinak\code\finance-mcp-server\main.py"
-        manager = MCPToolManager(server_path)
-        await manager.connect()
-        return manager
+@when('I open a new MCP connection')
+@async_to_sync
+async def open_mcp_connection(request, mcp_context, live_mcp_manager):
+    """Connect a fresh manager to the session's server, separate from the shared connection"""
+    manager = MCPToolManager(live_mcp_manager.server_url)
+    await manager.connect()
+    mcp_context['manager'] = manager
 
-    loop = asyncio.get_event_loop()
-    if loop.is_closed():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-    mcp_context['manager'] = loop.run_until_complete(_init())
+    # Close it even if a later step fails before the scenario closes it
+    request.addfinalizer(lambda: run_on_session_loop(manager.close()))
 
 
 @then('the connection should be established')
@@ -50,14 +45,10 @@ def connection_established(mcp_context):
 
 
 @then('I should see available tools loaded')
-def tools_loaded(mcp_context):
-    """Verify tools are loaded"""
-    async def _get_tools():
-        tools = await mcp_context['manager'].list_tools()
-        return tools
-
-    loop = asyncio.get_event_loop()
-    tools = loop.run_until_complete(_get_tools())
+@async_to_sync
+async def tools_loaded(mcp_context):
+    """Verify tools are loaded over the new connection"""
+    tools = await mcp_context['manager'].list_tools()
     mcp_context['tools'] = tools
     assert len(tools) > 0
 
@@ -65,9 +56,21 @@ def tools_loaded(mcp_context):
 @then(parsers.parse('the tools list should contain "{tool_name}"'))
 def tool_in_list(mcp_context, tool_name):
     """Verify specific tool is in the list"""
-    tools = mcp_context.get('tools', [])
-    tool_names = [tool.name for tool in tools]
-    assert tool_name in tool_names, f"{tool_name} not found in {tool_names}"
+    names = [tool.name for tool in mcp_context['tools']]
+    assert tool_name in names, f"{tool_name} not found in {names}"
+
+
+@when('I close the MCP connection')
+@async_to_sync
+async def close_mcp_connection(mcp_context):
+    """Close the fresh manager"""
+    await mcp_context['manager'].close()
+
+
+@then('the connection should be closed')
+def connection_closed(mcp_context):
+    """Verify the session is gone once closed"""
+    assert mcp_context['manager'].session is None
 
 
 @given('the MCP connection is established')
@@ -78,13 +81,9 @@ def mcp_connected(mcp_manager):
 
 
 @when('I request the list of tools')
-def request_tools(mcp_manager, mcp_context):
-    """Request list of tools"""
-    async def _list_tools():
-        return await mcp_manager.list_tools()
-
-    loop = asyncio.get_event_loop()
-    mcp_context['tools'] = loop.run_until_complete(_list_tools())
+def request_tools(mcp_context, mcp_tool_list):
+    """Request list of tools (listed once per session)"""
+    mcp_context['tools'] = mcp_tool_list
 
 
 @then(parsers.parse('I should receive {count:d} tools'))
@@ -102,17 +101,14 @@ def verify_tool_attributes(mcp_context):
 
 
 @when(parsers.parse('I call the tool "{tool_name}" with no arguments'))
-def call_tool_no_args(mcp_manager, mcp_context, tool_name):
+@async_to_sync
+async def call_tool_no_args(mcp_manager, mcp_context, tool_name):
     """Call tool without arguments"""
-    async def _call_tool():
-        try:
-            return await mcp_manager.call_tool(tool_name, {})
-        except Exception as e:
-            mcp_context['error'] = str(e)
-            return None
-
-    loop = asyncio.get_event_loop()
-    mcp_context['result'] = loop.run_until_complete(_call_tool())
+    try:
+        mcp_context['result'] = await mcp_manager.call_tool(tool_name, {})
+    except Exception as e:
+        mcp_context['error'] = str(e)
+        mcp_context['result'] = None
 
 
 @then('the tool should execute successfully')
@@ -130,17 +126,14 @@ def verify_result(mcp_context, expected_result):
 
 
 @when(parsers.parse('I call the tool "{tool_name}" with argument "{arg_name}" set to "{arg_value}"'))
-def call_tool_with_args(mcp_manager, mcp_context, tool_name, arg_name, arg_value):
+@async_to_sync
+async def call_tool_with_args(mcp_manager, mcp_context, tool_name, arg_name, arg_value):
     """Call tool with arguments"""
-    async def _call_tool():
-        try:
-            return await mcp_manager.call_tool(tool_name, {arg_name: arg_value})
-        except Exception as e:
-            mcp_context['error'] = str(e)
-            return None
-
-    loop = asyncio.get_event_loop()
-    mcp_context['result'] = loop.run_until_complete(_call_tool())
+    try:
+        mcp_context['result'] = await mcp_manager.call_tool(tool_name, {arg_name: arg_value})
+    except Exception as e:
+        mcp_context['error'] = str(e)
+        mcp_context['result'] = None
 
 
 @then(parsers.parse('the result should contain "{expected_text}"'))
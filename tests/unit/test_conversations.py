@@ -0,0 +1,85 @@
+"""
+Unit tests for chat history trimming and the server-side conversation store
+"""
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+import app as app_module
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the conversation store"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(app_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Empty conversation store for one test"""
+    conversations = {}
+    monkeypatch.setattr(app_module, "conversations", conversations)
+    return conversations
+
+
+def test_history_at_the_limit_is_untouched(monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_HISTORY", 4)
+    messages = [HumanMessage("q1"), AIMessage("a1"), HumanMessage("q2"), AIMessage("a2")]
+
+    assert app_module.trim_history(messages) is messages
+
+
+def test_history_over_the_limit_keeps_system_and_starts_on_user_turn(monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_HISTORY", 4)
+    system = SystemMessage("rules")
+    messages = [system, HumanMessage("q1"), AIMessage("a1"), HumanMessage("q2"), AIMessage("a2")]
+
+    # The 3-message window [a1, q2, a2] is advanced to the user turn
+    assert app_module.trim_history(messages) == [system, messages[3], messages[4]]
+
+
+def test_history_without_user_turn_in_window_is_untouched(monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_HISTORY", 3)
+    messages = [HumanMessage("q1"), AIMessage("a1"), AIMessage("a2"), AIMessage("a3")]
+
+    assert app_module.trim_history(messages) is messages
+
+
+def test_live_conversation_is_served_from_the_store(clock, store):
+    saved = [HumanMessage("q1"), AIMessage("a1")]
+    app_module.save_conversation("s1", saved)
+
+    clock.value += app_module.CONVERSATION_TTL_SECONDS - 1
+    loaded = app_module.load_conversation("s1", [])
+
+    assert loaded == saved
+    assert loaded is not store["s1"][1]
+
+
+def test_expired_conversation_falls_back_to_client_history(clock, store):
+    app_module.save_conversation("s1", [HumanMessage("server copy")])
+
+    clock.value += app_module.CONVERSATION_TTL_SECONDS
+    loaded = app_module.load_conversation("s1", [
+        {'role': 'user', 'content': 'q1'},
+        {'role': 'assistant', 'content': 'a1'},
+    ])
+
+    assert [(type(msg), msg.content) for msg in loaded] == [(HumanMessage, "q1"), (AIMessage, "a1")]
+
+
+def test_least_recently_saved_conversation_is_evicted(monkeypatch, clock, store):
+    monkeypatch.setattr(app_module, "MAX_CONVERSATIONS", 2)
+    app_module.save_conversation("s1", [HumanMessage("q1")])
+    app_module.save_conversation("s2", [HumanMessage("q2")])
+
+    # Saving s1 again makes s2 the oldest entry
+    app_module.save_conversation("s1", [HumanMessage("q1"), AIMessage("a1")])
+    app_module.save_conversation("s3", [HumanMessage("q3")])
+
+    assert list(store) == ["s1", "s3"]
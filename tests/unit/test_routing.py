@@ -0,0 +1,75 @@
+"""
+Unit tests for the precomputed routing table
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from agent.routing import _ROUTE_TABLE, _decide, route_next_action
+
+pytestmark = pytest.mark.unit
+
+
+def make_state(**overrides):
+    """Minimal agent state for route_next_action"""
+    state = {
+        "iteration_count": 0,
+        "max_iterations": 10,
+        "error_recovery_mode": False,
+        "retry_count": 0,
+        "max_retries": 3,
+        "needs_replanning": False,
+        "needs_validation": False,
+        "subtasks": [],
+        "tool_executions": [],
+        "validation_results": [],
+        "current_task": None,
+    }
+    state.update(overrides)
+    return state
+
+
+def test_table_covers_every_combination():
+    assert len(_ROUTE_TABLE) == 2 ** 7
+
+
+@pytest.mark.parametrize("bits, expected", [
+    ((True, True, True, True, True, True, True), "synthesizer"),
+    ((False, True, True, False, False, False, True), "error_handler"),
+    ((False, False, True, True, True, False, False), "planner"),
+    ((False, False, False, True, True, True, False), "validator"),
+    ((False, False, False, True, False, False, False), "synthesizer"),
+    ((False, False, False, False, False, True, True), "validator"),
+    ((False, False, False, False, False, False, True), "tool_caller"),
+    ((False, False, False, False, False, False, False), "synthesizer"),
+])
+def test_table_matches_decision_tree(bits, expected):
+    assert _decide(*bits) == expected
+    assert _ROUTE_TABLE[bits] == expected
+
+
+def test_pending_subtask_routes_to_tool_caller():
+    state = make_state(subtasks=[SimpleNamespace(status="completed"), SimpleNamespace(status="pending")])
+
+    assert route_next_action(state) == "tool_caller"
+
+
+def test_unvalidated_hpl_result_routes_to_validator():
+    hpl = SimpleNamespace(tool_name="calculate_hypothetical_pnl", result="165000")
+    state = make_state(
+        needs_validation=True,
+        subtasks=[SimpleNamespace(status="completed")],
+        tool_executions=[hpl],
+    )
+
+    assert route_next_action(state) == "validator"
+
+
+def test_exhausted_retries_do_not_reenter_error_handler():
+    state = make_state(
+        error_recovery_mode=True,
+        retry_count=3,
+        subtasks=[SimpleNamespace(status="failed")],
+    )
+
+    assert route_next_action(state) == "synthesizer"
@@ -0,0 +1,125 @@
+"""
+Unit tests for the streamed tool selection parser and early MCP dispatch
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agent.agent_state import SubTask
+from agent.nodes import tool_caller
+from agent.nodes.tool_caller import _StreamedToolCallParser, create_tool_caller
+
+pytestmark = pytest.mark.unit
+
+SELECTION = '{"tool": "get_account_pnl", "arguments": {"account_number": "ACCT-001"}}'
+
+
+def feed_all(parser, chunks):
+    """Feed chunks in order and return every non-None result"""
+    return [result for result in map(parser.feed, chunks) if result is not None]
+
+
+def test_selection_split_across_chunks():
+    parser = _StreamedToolCallParser()
+    chunks = ["Sure: ", SELECTION[:7], SELECTION[7:30], SELECTION[30:], " done"]
+
+    assert feed_all(parser, chunks) == [
+        {"tool": "get_account_pnl", "arguments": {"account_number": "ACCT-001"}}
+    ]
+    assert parser.text == "".join(chunks)
+
+
+def test_braces_inside_strings_do_not_close_the_object():
+    parser = _StreamedToolCallParser()
+    text = '{"tool": "update_hpl_formula", "arguments": {"hierarchy": "PRA", "new_formula": "x } { y"}}'
+
+    assert parser.feed(text[:60]) is None
+    assert parser.feed(text[60:]) == {
+        "tool": "update_hpl_formula",
+        "arguments": {"hierarchy": "PRA", "new_formula": "x } { y"},
+    }
+
+
+def test_escaped_quotes_stay_inside_the_string():
+    parser = _StreamedToolCallParser()
+    text = r'{"tool": "update_hpl_formula", "arguments": {"new_formula": "say \"}\" \\"}}'
+
+    # Split right after the backslash so the escape spans two chunks
+    split = text.index('\\"') + 1
+    assert parser.feed(text[:split]) is None
+    assert parser.feed(text[split:]) == {
+        "tool": "update_hpl_formula",
+        "arguments": {"new_formula": 'say "}" \\'},
+    }
+
+
+def test_non_tool_object_ends_the_scan():
+    # Only the first outermost object is considered; the full-text parse is the fallback
+    parser = _StreamedToolCallParser()
+
+    assert feed_all(parser, ['{"note": "thinking"} ', SELECTION]) == []
+    assert parser.done
+    assert parser.text.endswith(SELECTION)
+
+
+def test_invalid_json_returns_none():
+    parser = _StreamedToolCallParser()
+
+    assert parser.feed('{"tool": get_all_accounts}') is None
+    assert parser.done
+
+
+def test_stream_failure_fails_the_subtask_and_cancels_early_call(monkeypatch):
+    started = asyncio.Event()
+    cancelled = []
+
+    class SlowManager:
+        async def call_tool(self, tool_name, arguments):
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(tool_name)
+                raise
+
+    class FailingLLM:
+        async def astream(self, messages):
+            yield SimpleNamespace(content=SELECTION)
+            # Let the early call start before the stream fails
+            await started.wait()
+            raise RuntimeError("stream dropped")
+
+    monkeypatch.setattr(tool_caller, "get_llm", lambda temperature=0: FailingLLM())
+
+    subtask = SubTask(
+        id="task_1",
+        description="Get P&L for ACCT-001",
+        status="pending",
+        assigned_tools=["get_account_pnl"],
+    )
+    state = {
+        "subtasks": [subtask],
+        "subtasks_by_id": {subtask.id: subtask},
+        "current_task": subtask.id,
+        "intermediate_results": {},
+        "speculative_tool_call": None,
+        "original_query": "What is the P&L of ACCT-001?",
+        "iteration_count": 0,
+    }
+    execute_tools = create_tool_caller(SlowManager())
+
+    async def run():
+        update = await execute_tools(state)
+        # Give the cancelled task a turn to unwind
+        await asyncio.sleep(0)
+        return update
+
+    update = asyncio.run(run())
+
+    assert cancelled == ["get_account_pnl"]
+    assert subtask.status == "failed"
+    assert subtask.error == "stream dropped"
+    assert [(e["subtask_id"], e["error"]) for e in update["errors"]] == [("task_1", "stream dropped")]
+    assert update["error_recovery_mode"] is True
+    assert update["tool_executions"] == []
@@ -16,9 +16,12 @@ load_dotenv()
 async def list_available_prompts(mcp_manager):
     """List all available prompts from the MCP server"""
     print("\n=== Available MCP Prompts ===")
-    prompts_result = await mcp_manager.session.list_prompts()
+    # get_mcp_tools already listed the prompts alongside the tools
+    prompts = mcp_manager.prompts
+    if prompts is None:
+        prompts = await mcp_manager.list_prompts()
 
-    for prompt in prompts_result.prompts:
+    for prompt in prompts:
         print(f"\n[Prompt]: {prompt.name}")
         if prompt.description:
             print(f"   Description: {prompt.description}")
@@ -26,7 +29,7 @@ async def list_available_prompts(mcp_manager):
             args = [arg.name for arg in prompt.arguments]
             print(f"   Arguments: {', '.join(args)}")
 
-    return prompts_result.prompts
+    return prompts
 
 
 async def get_prompt_content(mcp_manager, prompt_name, arguments=None):
@@ -38,64 +41,87 @@ async def get_prompt_content(mcp_manager, prompt_name, arguments=None):
     return prompt_result
 
 
+async def call_tools(mcp_manager, tool_calls):
+    """Run an LLM turn's tool calls concurrently, returning results in tool_calls order"""
+    return await asyncio.gather(
+        *(mcp_manager.call_tool(tool_call['name'], tool_call['args']) for tool_call in tool_calls)
+    )
+
+
 async def demo_single_step_prompts(mcp_manager, llm_with_tools):
     """Demonstrate using individual step prompts"""
     print("\n" + "="*80)
     print("DEMO 1: Using Individual Step Prompts")
     print("="*80)
 
-    # Step 1: Get the first prompt
-    print("\n[Step 1]: Getting initial prompt...")
-    step1_result = await get_prompt_content(mcp_manager, "finance_step1")
+    # User provides hierarchy, then an account is selected (simulated up front)
+    hierarchy = "FHC"
+    account = "ACCT-001"
 
-    # Extract the prompt text
-    step1_text = step1_result.messages[0].content.text if step1_result.messages else ""
-    print(f"Prompt: {step1_text}")
+    # The step prompts only depend on these inputs, so fetch all four concurrently; steps 3
+    # and 4 are awaited later, so their fetches also overlap the step 2 LLM call
+    step3_task = asyncio.ensure_future(
+        get_prompt_content(mcp_manager, "finance_step3", {"hierarchy": hierarchy})
+    )
+    step4_task = asyncio.ensure_future(get_prompt_content(mcp_manager, "finance_step4", {
+        "hierarchy": hierarchy,
+        "account_number": account
+    }))
+    try:
+        step1_result, step2_result = await asyncio.gather(
+            get_prompt_content(mcp_manager, "finance_step1"),
+            get_prompt_content(mcp_manager, "finance_step2", {"hierarchy": hierarchy})
+        )
 
-    # User provides hierarchy
-    hierarchy = "FHC"
-    print(f"User response: {hierarchy}")
+        # Step 1: Get the first prompt
+        print("\n[Step 1]: Getting initial prompt...")
 
-    # Step 2: Get formula prompt with hierarchy
-    print("\n[Step 2]: Getting formula prompt...")
-    step2_result = await get_prompt_content(mcp_manager, "finance_step2", {"hierarchy": hierarchy})
-    step2_text = step2_result.messages[0].content.text if step2_result.messages else ""
-    print(f"Prompt: {step2_text}")
+        # Extract the prompt text
+        step1_text = step1_result.messages[0].content.text if step1_result.messages else ""
+        print(f"Prompt: {step1_text}")
 
-    # Use LLM to execute this step
-    response = await llm_with_tools.ainvoke([HumanMessage(content=step2_text)])
-    print(f"LLM Response: {response.content}")
+        print(f"User response: {hierarchy}")
 
-    if hasattr(response, 'tool_calls') and response.tool_calls:
-        for tool_call in response.tool_calls:
-            result = await mcp_manager.call_tool(tool_call['name'], tool_call['args'])
-            print(f"Tool Result: {result}")
+        # Step 2: Get formula prompt with hierarchy
+        print("\n[Step 2]: Getting formula prompt...")
+        step2_text = step2_result.messages[0].content.text if step2_result.messages else ""
+        print(f"Prompt: {step2_text}")
 
-    # Step 3: Get random account
-    print("\n[Step 3]: Getting account selection prompt...")
-    step3_result = await get_prompt_content(mcp_manager, "finance_step3", {"hierarchy": hierarchy})
-    step3_text = step3_result.messages[0].content.text if step3_result.messages else ""
-    print(f"Prompt: {step3_text}")
+        # Use LLM to execute this step
+        response = await llm_with_tools.ainvoke([HumanMessage(content=step2_text)])
+        print(f"LLM Response: {response.content}")
 
-    # Simulate account selection
-    account = "ACCT-001"
-    print(f"Selected account: {account}")
+        if hasattr(response, 'tool_calls') and response.tool_calls:
+            for result in await call_tools(mcp_manager, response.tool_calls):
+                print(f"Tool Result: {result}")
 
-    # Step 4: Calculate HPL
-    print("\n[Step 4]: Getting calculation prompt...")
-    step4_result = await get_prompt_content(mcp_manager, "finance_step4", {
-        "hierarchy": hierarchy,
-        "account_number": account
-    })
-    step4_text = step4_result.messages[0].content.text if step4_result.messages else ""
-    print(f"Prompt: {step4_text}")
+        # Step 3: Get random account
+        print("\n[Step 3]: Getting account selection prompt...")
+        step3_result = await step3_task
+        step3_text = step3_result.messages[0].content.text if step3_result.messages else ""
+        print(f"Prompt: {step3_text}")
 
-    response = await llm_with_tools.ainvoke([HumanMessage(content=step4_text)])
+        # Simulate account selection
+        print(f"Selected account: {account}")
 
-    if hasattr(response, 'tool_calls') and response.tool_calls:
-        for tool_call in response.tool_calls:
-            result = await mcp_manager.call_tool(tool_call['name'], tool_call['args'])
-            print(f"Calculation Result: {result}")
+        # Step 4: Calculate HPL
+        print("\n[Step 4]: Getting calculation prompt...")
+        step4_result = await step4_task
+        step4_text = step4_result.messages[0].content.text if step4_result.messages else ""
+        print(f"Prompt: {step4_text}")
+
+        response = await llm_with_tools.ainvoke([HumanMessage(content=step4_text)])
+
+        if hasattr(response, 'tool_calls') and response.tool_calls:
+            for result in await call_tools(mcp_manager, response.tool_calls):
+                print(f"Calculation Result: {result}")
+    finally:
+        # If an earlier step failed, stop the prefetches and collect any error they raised
+        for task in (step3_task, step4_task):
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()
 
 
 async def demo_complete_workflow_prompt(mcp_manager, llm_with_tools):
@@ -125,9 +151,9 @@ async def demo_complete_workflow_prompt(mcp_manager, llm_with_tools):
 
         # Execute any tool calls
         if hasattr(response, 'tool_calls') and response.tool_calls:
-            for tool_call in response.tool_calls:
+            results = await call_tools(mcp_manager, response.tool_calls)
+            for tool_call, result in zip(response.tool_calls, results):
                 print(f"Calling tool: {tool_call['name']}")
-                result = await mcp_manager.call_tool(tool_call['name'], tool_call['args'])
                 print(f"Result: {result}")
 
         # If there's text content, print it
@@ -149,17 +175,23 @@ async def demo_integrated_conversation(mcp_manager, llm_with_tools):
     Follow the user's instructions to analyze hypothetical P&L data.""")
     conversation_history.append(system_msg)
 
-    # Get step 1 prompt and add to conversation
-    step1_result = await get_prompt_content(mcp_manager, "finance_step1")
+    # User's (scripted) choice, known before the prompts are fetched
+    user_choice = "PRA"
+
+    # Fetch the step 1 and step 2 prompts concurrently
+    step1_result, step2_result = await asyncio.gather(
+        get_prompt_content(mcp_manager, "finance_step1"),
+        get_prompt_content(mcp_manager, "finance_step2", {"hierarchy": user_choice})
+    )
+
+    # Add step 1 prompt to conversation
     step1_text = step1_result.messages[0].content.text
     conversation_history.append(AIMessage(content=step1_text))
 
     # User responds
-    user_choice = "PRA"
     conversation_history.append(HumanMessage(content=f"I want to analyze the {user_choice} hierarchy"))
 
-    # Get step 2 prompt
-    step2_result = await get_prompt_content(mcp_manager, "finance_step2", {"hierarchy": user_choice})
+    # Add step 2 prompt
     step2_text = step2_result.messages[0].content.text
     conversation_history.append(HumanMessage(content=step2_text))
 
@@ -174,9 +206,9 @@ async def demo_integrated_conversation(mcp_manager, llm_with_tools):
 
     if hasattr(response, 'tool_calls') and response.tool_calls:
         print(f"\nLLM decided to use {len(response.tool_calls)} tool(s):")
-        for tool_call in response.tool_calls:
+        results = await call_tools(mcp_manager, response.tool_calls)
+        for tool_call, result in zip(response.tool_calls, results):
             print(f"  - {tool_call['name']}({tool_call['args']})")
-            result = await mcp_manager.call_tool(tool_call['name'], tool_call['args'])
             print(f"    Result: {result}")
 
 
@@ -191,6 +223,7 @@ async def main():
     mcp_server_path = r"C:\Users\pinak\code\finance-mcp-server\main.py"
     tools, mcp_manager = await get_mcp_tools(mcp_server_path)
 
+    release_task = None
     try:
         # Bind tools to LLM
         llm_with_tools = llm.bind_tools(tools)
@@ -203,13 +236,16 @@ async def main():
         await demo_complete_workflow_prompt(mcp_manager, llm_with_tools)
         await demo_integrated_conversation(mcp_manager, llm_with_tools)
 
+        # Start closing the connection while the summary is printed
+        release_task = asyncio.ensure_future(mcp_manager.release())
+
         print("\n" + "="*80)
         print("All demos completed!")
         print("="*80)
 
     finally:
         print("\nClosing MCP connection...")
-        await mcp_manager.close()
+        await (release_task or mcp_manager.release())
 
 
 if __name__ == "__main__":